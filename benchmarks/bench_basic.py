@@ -0,0 +1,84 @@
+from pyfinmod.basic import npv, irr, flat_payments, retirement_problem
+from pyfinmod.portfolio import batch_irr, batch_valuation, amortization_schedules
+
+import numpy as np
+
+from .common import cash_flows
+
+
+class NPV:
+    params = [1000, 100000, 1000000]
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.df = cash_flows(rows)
+
+    def time_npv(self, rows):
+        npv(self.df, 0.1)
+
+    def peakmem_npv(self, rows):
+        npv(self.df, 0.1)
+
+
+class IRR:
+    def setup(self):
+        self.df = cash_flows(20)
+
+    def time_irr(self):
+        irr(self.df, 0.1)
+
+    def peakmem_irr(self):
+        irr(self.df, 0.1)
+
+
+class BatchIRR:
+    params = [1000, 50000]
+    param_names = ["instruments"]
+
+    def setup(self, instruments):
+        self.df = cash_flows(instruments * 20, instruments=instruments)
+
+    def time_batch_irr(self, instruments):
+        batch_irr(self.df, 0.1)
+
+    def peakmem_batch_irr(self, instruments):
+        batch_irr(self.df, 0.1)
+
+
+class BatchValuation:
+    params = [1000, 50000]
+    param_names = ["instruments"]
+
+    def setup(self, instruments):
+        self.df = cash_flows(instruments * 20, instruments=instruments)
+
+    def time_batch_valuation(self, instruments):
+        batch_valuation(self.df, 0.08, 0.1)
+
+    def peakmem_batch_valuation(self, instruments):
+        batch_valuation(self.df, 0.08, 0.1)
+
+
+class FlatPayments:
+    def time_flat_payments(self):
+        flat_payments(100000, 0.05, 360, period="month")
+
+    def time_retirement_problem_grid(self):
+        retirement_problem(24, np.linspace(10000, 100000, 1000)[:, np.newaxis], 25, np.linspace(0.01, 0.1, 1000))
+
+
+class AmortizationSchedules:
+    params = [1000, 100000]
+    param_names = ["loans"]
+
+    def setup(self, loans):
+        rng = np.random.default_rng(0)
+        self.principal = rng.uniform(1e4, 1e5, loans)
+        self.rate = rng.uniform(0.02, 0.08, loans)
+        self.term = rng.integers(12, 360, loans)
+
+    def time_amortization_schedules(self, loans):
+        amortization_schedules(self.principal, self.rate, self.term, period="month")
+
+    def peakmem_amortization_schedules(self, loans):
+        amortization_schedules(self.principal, self.rate, self.term, period="month")
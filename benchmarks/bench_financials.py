@@ -0,0 +1,40 @@
+from pyfinmod.financials import Financials
+
+from .common import BALANCE_SHEET_ITEMS, StubServer, statement_records
+
+
+class JSONToDataFrame:
+    params = [10, 1000, 100000]
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.records = statement_records(rows, BALANCE_SHEET_ITEMS)
+
+    def time_json_to_df(self, rows):
+        Financials._json_to_df(self.records)
+
+    def peakmem_json_to_df(self, rows):
+        Financials._json_to_df(self.records)
+
+
+class FetchMany:
+    """Throughput of the fetch layer against a local stub HTTP server"""
+
+    params = [10, 200]
+    param_names = ["tickers"]
+    timeout = 120
+
+    def setup(self, tickers):
+        self.server = StubServer()
+
+        class StubFinancials(Financials):
+            datatypes = self.server.datatypes
+
+        self.financials_class = StubFinancials
+        self.tickers = ["T{}".format(i) for i in range(tickers)]
+
+    def teardown(self, tickers):
+        self.server.stop()
+
+    def time_fetch_many(self, tickers):
+        self.financials_class.fetch_many(self.tickers, datatypes=["balance_sheet_statement"], max_workers=16)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from pyfinmod.ev import dcf, dcf_grid, enterprise_value, net_debt
+from pyfinmod.wacc import wacc
+
+from .common import statements
+
+
+class DCF:
+    def setup(self):
+        dates = pd.date_range("2010-09-30", periods=10, freq="365D").date
+        self.fcfs = pd.Series(np.linspace(5e10, 6e10, 10), index=dates)
+
+    def time_dcf(self):
+        dcf(self.fcfs, 0.085, 0.08, 0.04)
+
+    def time_dcf_grid(self):
+        dcf_grid(self.fcfs, np.linspace(0.07, 0.12, 100), np.linspace(0.0, 0.1, 100), np.linspace(0.0, 0.05, 100))
+
+
+class Valuation:
+    params = [1, 100, 3000]
+    param_names = ["tickers"]
+
+    def setup(self, tickers):
+        self.balance_sheets, self.income_statements = statements(tickers)
+        self.panel = pd.concat(self.balance_sheets, names=["ticker"])
+        self.income_panel = pd.concat(self.income_statements, names=["ticker"])
+        index = list(self.balance_sheets)
+        self.equity = pd.Series(1e12, index=index)
+        self.beta = pd.Series(1.1, index=index)
+
+    def time_enterprise_value(self, tickers):
+        enterprise_value(self.panel)
+
+    def time_net_debt(self, tickers):
+        net_debt(self.panel)
+
+    def time_wacc(self, tickers):
+        wacc(self.equity, self.panel, self.income_panel, self.beta, 0.02, 0.08)
+
+    def peakmem_wacc(self, tickers):
+        wacc(self.equity, self.panel, self.income_panel, self.beta, 0.02, 0.08)
@@ -0,0 +1,95 @@
+import json
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+BALANCE_SHEET_ITEMS = [
+    "Cash and cash equivalents",
+    "Short-term investments",
+    "Total current assets",
+    "Total non-current assets",
+    "Short-term debt",
+    "Total current liabilities",
+    "Long-term debt",
+    "Other Assets",
+]
+INCOME_STATEMENT_ITEMS = ["Revenue", "Interest Expense", "Earnings before Tax", "Income Tax Expense"]
+
+
+def cash_flows(rows, instruments=1, seed=0):
+    """Long frame of quarterly cash flows, each instrument starting with an investment of -100"""
+    rng = np.random.default_rng(seed)
+    per_instrument = rows // instruments
+    flows = rng.uniform(5, 15, per_instrument * instruments)
+    flows[::per_instrument] = -100
+    # quarterly flows over at most 30 years
+    days = np.tile(np.arange(per_instrument) % 120 * 91, instruments)
+    return pd.DataFrame(
+        {
+            "instrument": np.repeat(np.arange(instruments), per_instrument),
+            "cash flow": flows,
+            "date": np.datetime64("2020-01-01", "D") + days,
+        }
+    )
+
+
+def statement_records(n_dates, items, seed=0):
+    """Statement JSON records as returned by the API, one per day with the newest date first"""
+    rng = np.random.default_rng(seed)
+    first = date(2019, 9, 28)
+    return [
+        dict(
+            [("date", str(first - timedelta(days=i)))]
+            + [(item, "{:.1f}".format(value)) for item, value in zip(items, rng.uniform(1e9, 1e11, len(items)))]
+        )
+        for i in range(n_dates)
+    ]
+
+
+def statements(tickers, n_dates=10, seed=0):
+    """Dictionaries of yearly balance sheets and income statements by ticker"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end="2019-09-28", periods=n_dates, freq="364D")[::-1].date
+    balance_sheets, income_statements = {}, {}
+    for i in range(tickers):
+        ticker = "T{}".format(i)
+        for frames, items in [(balance_sheets, BALANCE_SHEET_ITEMS), (income_statements, INCOME_STATEMENT_ITEMS)]:
+            frames[ticker] = pd.DataFrame(
+                rng.uniform(1e9, 1e11, (len(items), n_dates)), index=pd.Index(items, name="Items"), columns=dates
+            )
+    return balance_sheets, income_statements
+
+
+class StubServer:
+    """Local keep-alive HTTP server answering every /<datatype>/<ticker> request with the same statement"""
+
+    def __init__(self, n_dates=10):
+        body = json.dumps({"financials": statement_records(n_dates, BALANCE_SHEET_ITEMS)}).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        url = "http://127.0.0.1:{}/".format(self.server.server_address[1])
+        self.datatypes = {
+            datatype: url + datatype + "/{}"
+            for datatype in ["balance_sheet_statement", "cash_flow_statement", "income_statement", "profile"]
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
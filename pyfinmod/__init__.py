@@ -0,0 +1,34 @@
+import importlib
+
+_submodules = [
+    "basic",
+    "cache",
+    "constants",
+    "curve",
+    "ev",
+    "financials",
+    "ingest",
+    "instrumentation",
+    "outofcore",
+    "portfolio",
+    "runner",
+    "scheduler",
+    "simulation",
+    "store",
+    "streaming",
+    "universe",
+    "wacc",
+]
+
+__all__ = list(_submodules)
+
+
+def __getattr__(name):
+    """Import submodules on first access, e.g. pyfinmod.basic.npv after a plain `import pyfinmod`"""
+    if name in _submodules:
+        return importlib.import_module("pyfinmod." + name)
+    raise AttributeError("module 'pyfinmod' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + _submodules)
@@ -0,0 +1,27 @@
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module which is imported on first attribute access
+
+    Heavy dependencies (NumPy, pandas, requests, PyTables) are bound to LazyModule objects at module level,
+    so importing pyfinmod does not import them until a function actually needs them. Looked up attributes
+    are cached on the stand-in, later lookups cost the same as on the module itself.
+
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.__dict__["_name"])
+        value = getattr(module, attribute)
+        self.__dict__[attribute] = value
+        return value
+
+    def __repr__(self):
+        return "<lazy module '{}'>".format(self.__dict__["_name"])
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,34 @@
+from pyfinmod._lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def to_datetime64(dates):
+    dates = np.asarray(dates)
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        dates = dates.astype("datetime64[us]")
+    return dates
+
+
+def epoch_days(dates):
+    """int64 days since 1970-01-01 of an array of dates; integer dates are taken to be days already"""
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.integer):
+        return dates.astype(np.int64)
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        dates = np.asarray(pd.to_datetime(dates))
+    return dates.astype("datetime64[D]").astype(np.int64)
+
+
+def segment_lengths(starts, size):
+    return np.diff(np.append(starts, size))
+
+
+def sort_segments(instruments, dates):
+    """Order which sorts rows by (instrument, date), the instrument labels of the sorted segments and their starts"""
+    codes, labels = pd.factorize(instruments, sort=True)
+    order = np.lexsort((dates, codes))
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return order, labels[codes[starts]], starts
@@ -1,87 +1,155 @@
 from functools import partial
+from hashlib import sha1
 from datetime import date
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from math import log
 
-from dateutil.relativedelta import relativedelta
-import pandas as pd
-from scipy.optimize import fsolve
-
+from pyfinmod._lazy import lazy_import
+from pyfinmod._segments import segment_lengths, sort_segments
+from pyfinmod.instrumentation import instrumented
+from pyfinmod.curve import YieldCurve
 from pyfinmod.constants import (
     DAYS_IN_YEAR,
     MONTH_IN_YEAR,
     QUARTERS_IN_YEAR,
-    MONTH_IN_QUARTER,
     DAYS_IN_WEEK,
 )
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+_PERIODS_IN_YEAR = {
+    "day": DAYS_IN_YEAR,
+    "week": DAYS_IN_YEAR / DAYS_IN_WEEK,
+    "month": MONTH_IN_YEAR,
+    "quarter": QUARTERS_IN_YEAR,
+    "year": 1,
+}
+
+# bytes of discount factors kept for callers passing cache=True to discount_factors
+DISCOUNT_FACTOR_CACHE_BYTES = 64 * 2 ** 20
+
+_discount_factor_cache = OrderedDict()
+_discount_factor_cache_bytes = 0
 
+
+def _periods_in_year(period):
+    period = np.asarray(period)
+    if period.ndim == 0:
+        return _PERIODS_IN_YEAR[str(period)]
+    names, inverse = np.unique(period, return_inverse=True)
+    return np.array([_PERIODS_IN_YEAR[str(name)] for name in names])[inverse].reshape(period.shape)
+
+
+@instrumented
 def convert_ir(r, from_period="year", to_period="day"):
-    powers = {
-        "year": {
-            "day": 1 / DAYS_IN_YEAR,
-            "week": DAYS_IN_WEEK / DAYS_IN_YEAR,
-            "month": 1 / MONTH_IN_YEAR,
-            "quarter": 1 / QUARTERS_IN_YEAR,
-            "year": 1,
-        },
-        "quarter": {
-            "day": 1 / (DAYS_IN_YEAR / QUARTERS_IN_YEAR),
-            "week": 1 / (DAYS_IN_YEAR / QUARTERS_IN_YEAR / DAYS_IN_WEEK),
-            "month": 1 / MONTH_IN_QUARTER,
-            "quarter": 1,
-            "year": QUARTERS_IN_YEAR,
-        },
-        "month": {
-            "day": 1 / (DAYS_IN_YEAR / MONTH_IN_YEAR),
-            "week": 1 / (DAYS_IN_YEAR / MONTH_IN_YEAR / DAYS_IN_WEEK),
-            "month": 1,
-            "quarter": MONTH_IN_QUARTER,
-            "year": MONTH_IN_YEAR,
-        },
-        "week": {
-            "day": 1 / DAYS_IN_WEEK,
-            "week": 1,
-            "month": DAYS_IN_YEAR / MONTH_IN_YEAR / DAYS_IN_WEEK,
-            "quarter": DAYS_IN_YEAR / QUARTERS_IN_YEAR / DAYS_IN_WEEK,
-            "year": DAYS_IN_YEAR / DAYS_IN_WEEK,
-        },
-        "day": {
-            "day": 1,
-            "week": DAYS_IN_WEEK,
-            "month": DAYS_IN_YEAR / MONTH_IN_YEAR,
-            "quarter": DAYS_IN_YEAR / QUARTERS_IN_YEAR,
-            "year": DAYS_IN_YEAR,
-        },
-    }
-    return (1 + r) ** (powers[from_period][to_period]) - 1
-
-
-def _calculate_discounted(cf, annual_interest_rate, days_passed):
-    daily_interest_rate = convert_ir(
-        annual_interest_rate, from_period="year", to_period="day"
-    )
-    return cf / (1 + daily_interest_rate) ** days_passed
+    """Convert an interest rate between compounding periods
+
+    r, from_period and to_period broadcast as NumPy arrays, so many rates and period pairs are converted at
+    once; scalar arguments return a scalar.
+
+    """
+    power = _periods_in_year(from_period) / _periods_in_year(to_period)
+    converted = (1 + np.asarray(r, dtype=float)) ** power - 1
+    return converted if converted.ndim else converted[()]
+
+
+def _cache_discount_factors(key, factors):
+    global _discount_factor_cache_bytes
+    factors.setflags(write=False)
+    if factors.nbytes > DISCOUNT_FACTOR_CACHE_BYTES or key in _discount_factor_cache:
+        return
+    _discount_factor_cache[key] = factors
+    _discount_factor_cache_bytes += factors.nbytes
+    while _discount_factor_cache_bytes > DISCOUNT_FACTOR_CACHE_BYTES:
+        _, evicted = _discount_factor_cache.popitem(last=False)
+        _discount_factor_cache_bytes -= evicted.nbytes
+
+
+def _array_key(a):
+    return a.dtype.str, a.shape, a.tobytes()
+
+
+@instrumented
+def discount_factors(rate, days_passed, period="year", cache=False):
+    """Discount factors of rate per period on a grid of days passed, shaped rate.shape + days_passed.shape
+
+    Factors of all rates are computed at once. If cache is True, the read-only result is kept in an LRU cache
+    of up to DISCOUNT_FACTOR_CACHE_BYTES bytes keyed by rate, period and a digest of the grid, so valuations
+    repeated on the same dates reuse it.
+
+    """
+    rates = np.asarray(rate, dtype=float)
+    days_passed = np.asarray(days_passed)
+    if cache:
+        grid = np.ascontiguousarray(days_passed)
+        key = (
+            _array_key(rates),
+            _array_key(np.asarray(period)),
+            grid.dtype.str,
+            grid.shape,
+            sha1(grid.reshape(-1).view(np.uint8)).digest(),
+        )
+        cached = _discount_factor_cache.get(key)
+        if cached is not None:
+            _discount_factor_cache.move_to_end(key)
+            return cached
+    growth = 1 + convert_ir(rates, from_period=period, to_period="day")
+    factors = np.asarray(growth).reshape(np.shape(growth) + (1,) * days_passed.ndim) ** -days_passed
+    if cache:
+        _cache_discount_factors(key, factors)
+    return factors
+
 
+def _calculate_discounted(cf, annual_interest_rate, days_passed, cache=False):
+    if isinstance(annual_interest_rate, YieldCurve):
+        return cf * annual_interest_rate.discount(days_passed)
+    return cf * discount_factors(annual_interest_rate, days_passed, cache=cache)
 
+
+def _days_passed(dates):
+    dates = np.asarray(dates)
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        dates = dates.astype("datetime64[us]")
+    return (dates - dates.min()) // np.timedelta64(1, "D")
+
+
+def _cash_flows_and_dates(data, cash_flow_column_name, date_column_name):
+    if isinstance(data, pd.Series):
+        return data.to_numpy(dtype=float), data.index
+    return np.asarray(data[cash_flow_column_name], dtype=float), data[date_column_name]
+
+
+@instrumented
 def npv(
     dataframe,
     annual_discount_rate,
     cash_flow_column_name="cash flow",
     date_column_name="date",
+    cache=False,
 ):
-    date_start = dataframe[date_column_name].min()
-    mapper = lambda x: _calculate_discounted(
-        x[cash_flow_column_name],
-        annual_discount_rate,
-        (x[date_column_name] - date_start).days,
-    )
-    return (
-        dataframe[[cash_flow_column_name, date_column_name]].apply(mapper, axis=1).sum()
+    """Net present value of dated cash flows discounted to the earliest date
+
+    dataframe can be a pd.DataFrame, a dict of arrays or a structured np.ndarray with cash flow and date
+    columns, or a pd.Series of cash flows indexed by date. If annual_discount_rate is an array, an array of
+    NPVs (one per rate) is returned. If it is a YieldCurve, every cash flow is discounted at the curve's zero
+    rate of its days passed. With cache=True the discount factors of flat rates are reused by later calls on
+    the same dates, see discount_factors.
+
+    """
+    cash_flows, dates = _cash_flows_and_dates(
+        dataframe, cash_flow_column_name, date_column_name
     )
+    days_passed = _days_passed(dates)
+    result = _calculate_discounted(cash_flows, annual_discount_rate, days_passed, cache=cache).sum(axis=-1)
+    return result if result.ndim else result[()]
 
 
+@instrumented
 def irr(dataframe, guess=0, cash_flow_column_name="cash flow", date_column_name="date"):
+    from scipy.optimize import fsolve
+
     f = partial(
         npv,
         dataframe,
@@ -92,14 +160,51 @@ def irr(dataframe, guess=0, cash_flow_column_name="cash flow", date_column_name=
     return list(result)
 
 
+@instrumented
+def irr_spread(
+    dataframe, curve, guess=0, cash_flow_column_name="cash flow", date_column_name="date"
+):
+    """Spread over the zero rates of a YieldCurve which makes the npv of the cash flows zero
+
+    The curve is interpolated once for the dates of the cash flows, only the spread changes between
+    iterations.
+
+    """
+    from scipy.optimize import fsolve
+
+    cash_flows, dates = _cash_flows_and_dates(
+        dataframe, cash_flow_column_name, date_column_name
+    )
+    days_passed = _days_passed(dates)
+    years = days_passed / DAYS_IN_YEAR
+    growth = 1 + curve.zero_rates(days_passed)
+
+    def f(spread):
+        return (cash_flows * (growth + spread[..., np.newaxis]) ** -years).sum(axis=-1)
+
+    result = fsolve(f, guess)
+    return list(result)
+
+
+def _flat_payment(principal, periodic_interest, term):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = (principal * periodic_interest) / (
+            1 - (1 + periodic_interest) ** (-np.asarray(term))
+        )
+    return np.where(periodic_interest == 0, np.divide(principal, term), payment)
+
+
+@instrumented
 def pmt(principal, annual_interest_rate, term, period="year"):
+    """Flat payment per period; all numeric arguments broadcast as NumPy arrays"""
     periodic_interest = convert_ir(
-        annual_interest_rate, from_period="year", to_period=period
+        np.asarray(annual_interest_rate, dtype=float), from_period="year", to_period=period
     )
-    payment = (principal * periodic_interest) / (1 - (1 + periodic_interest) ** (-term))
-    return payment
+    payment = _flat_payment(principal, periodic_interest, term)
+    return payment if payment.ndim else payment[()]
 
 
+@instrumented
 def flat_payments(principal, annual_interest_rate, term, period="year"):
     _pmt = pmt(principal, annual_interest_rate, term, period=period)
     data = defaultdict(list)
@@ -124,20 +229,48 @@ def flat_payments(principal, annual_interest_rate, term, period="year"):
     return pd.DataFrame.from_dict(data)
 
 
+@instrumented
 def fv(deposits, annual_interest_rate, period="year"):
+    """Future value of deposits made at the beginning of each period
+
+    The last axis of deposits is time; annual_interest_rate may be an array and broadcasts over the other axes.
+
+    """
+    deposits = np.asarray(deposits, dtype=float)
     periodic_interest = convert_ir(
-        annual_interest_rate, from_period="year", to_period=period
+        np.asarray(annual_interest_rate, dtype=float), from_period="year", to_period=period
+    )
+    number_of_deposits = deposits.shape[-1]
+    growth = (1 + periodic_interest[..., np.newaxis]) ** np.arange(
+        number_of_deposits, 0, -1
+    )
+    future_value = (deposits * growth).sum(axis=-1)
+    return future_value if future_value.ndim else future_value[()]
+
+
+@instrumented
+def fv_annuity(deposit, annual_interest_rate, term, period="year"):
+    """Closed form of fv for term equal deposits; all arguments broadcast as NumPy arrays"""
+    periodic_interest = convert_ir(
+        np.asarray(annual_interest_rate, dtype=float), from_period="year", to_period=period
+    )
+    growth = 1 + periodic_interest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        future_value = (
+            deposit * growth * (growth ** np.asarray(term) - 1) / periodic_interest
+        )
+    future_value = np.where(
+        periodic_interest == 0, np.multiply(deposit, term), future_value
     )
-    future_value = 0
-    number_of_deposits = len(deposits)
-    for n, deposit in enumerate(deposits):
-        future_value += deposit * (1 + periodic_interest) ** (number_of_deposits - n)
-    return future_value
+    return future_value if future_value.ndim else future_value[()]
 
 
+@instrumented
 def get_retirement_cf_dataframe(
     deposit, terms_of_deposit, withdrawal, terms_of_withdrawal, period="year"
 ):
+    from dateutil.relativedelta import relativedelta
+
     cash_flows = [deposit] * terms_of_deposit + [-withdrawal] * terms_of_withdrawal
     terms = terms_of_deposit + terms_of_withdrawal
     dates = [date.today() + relativedelta(**{period + "s": i}) for i in range(terms)]
@@ -145,6 +278,16 @@ def get_retirement_cf_dataframe(
     return df
 
 
+def _period_days_passed(terms, period="year"):
+    from dateutil.relativedelta import relativedelta
+
+    today = date.today()
+    return np.array(
+        [(today + relativedelta(**{period + "s": i}) - today).days for i in range(terms)]
+    )
+
+
+@instrumented
 def retirement_problem(
     terms_of_deposit,
     withdrawal,
@@ -152,21 +295,38 @@ def retirement_problem(
     annual_discount_rate,
     period="year",
 ):
-    retirement_dataframe_by_deposit = partial(
-        get_retirement_cf_dataframe,
-        terms_of_deposit=terms_of_deposit,
-        withdrawal=withdrawal,
-        terms_of_withdrawal=terms_of_withdrawal,
-        period=period,
+    """Minimal deposit which funds the withdrawals, i.e. makes the NPV of the retirement cash flows zero
+
+    NPV is linear in the deposit, so the deposit is the ratio of the discounted withdrawals to the discounted
+    deposits. Discount factors are computed once per distinct rate on the calendar grid of
+    get_retirement_cf_dataframe. All arguments broadcast as NumPy arrays; scalar arguments return a
+    one-element list.
+
+    """
+    terms_of_deposit, withdrawal, terms_of_withdrawal, rates = np.broadcast_arrays(
+        np.asarray(terms_of_deposit, dtype=int),
+        np.asarray(withdrawal, dtype=float),
+        np.asarray(terms_of_withdrawal, dtype=int),
+        np.asarray(annual_discount_rate, dtype=float),
     )
-    f = lambda deposit: npv(
-        retirement_dataframe_by_deposit(deposit), annual_discount_rate
+    terms = terms_of_deposit + terms_of_withdrawal
+    days_passed = _period_days_passed(int(terms.max()), period=period)
+    unique_rates, rate_index = np.unique(rates, return_inverse=True)
+    rate_index = rate_index.reshape(rates.shape)
+    factors = discount_factors(unique_rates, days_passed)
+    cumulative_factors = np.concatenate(
+        [np.zeros((len(unique_rates), 1)), factors.cumsum(axis=1)], axis=1
     )
-    result = fsolve(f, withdrawal)
-    return list(result)
+    deposits_value = cumulative_factors[rate_index, terms_of_deposit]
+    withdrawals_value = cumulative_factors[rate_index, terms] - deposits_value
+    deposit = withdrawal * withdrawals_value / deposits_value
+    return [deposit[()]] if deposit.ndim == 0 else deposit
 
 
+@instrumented
 def get_annual_rate_cc(dataframe, amount_column_name="amount", date_column_name="date"):
+    from dateutil.relativedelta import relativedelta
+
     amount_first = dataframe[amount_column_name].iloc[0]
     amount_last = dataframe[amount_column_name].iloc[-1]
     date_first = dataframe[date_column_name].iloc[0]
@@ -175,3 +335,97 @@ def get_annual_rate_cc(dataframe, amount_column_name="amount", date_column_name=
     t = delta.years + delta.months / 12 + delta.days / 365
     r = log(amount_last / amount_first) / t
     return r
+
+
+def _sorted_series(dataframe, instrument_column_name, amount_column_name, date_column_name):
+    """Order of a long price frame sorted by (instrument, date), with the sorted values and segment starts"""
+    dates = np.asarray(dataframe[date_column_name]).astype("datetime64[D]")
+    order, labels, starts = sort_segments(dataframe[instrument_column_name], dates)
+    amounts = np.asarray(dataframe[amount_column_name], dtype=float)[order]
+    return order, labels, amounts, dates[order], starts
+
+
+def _years_between(start, end):
+    return (end - start) / np.timedelta64(1, "D") / DAYS_IN_YEAR
+
+
+@instrumented
+def annual_rates_cc(
+    prices,
+    amount_column_name="amount",
+    date_column_name="date",
+    instrument_column_name="instrument",
+):
+    """Continuously compounded annual rates of many price series from their first and last prices
+
+    prices is a wide date x series pd.DataFrame with NaN where a series has no price, or a long frame with
+    instrument, date and amount columns. Years are days / 365, so rates differ slightly from the calendar
+    years of get_annual_rate_cc. Returns a pd.Series of rates by series.
+
+    """
+    if date_column_name in prices.columns:
+        prices = prices[prices[amount_column_name].notna()]
+        order, labels, amounts, dates, starts = _sorted_series(
+            prices, instrument_column_name, amount_column_name, date_column_name
+        )
+        ends = np.r_[starts[1:], len(amounts)] - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.log(amounts[ends] / amounts[starts]) / _years_between(dates[starts], dates[ends])
+        return pd.Series(rates, index=pd.Index(labels, name=instrument_column_name), name="rate")
+
+    prices = prices.sort_index()
+    values = prices.to_numpy(dtype=float)
+    dates = np.asarray(prices.index).astype("datetime64[D]")
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    last = len(values) - 1 - valid[::-1].argmax(axis=0)
+    columns = np.arange(values.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.log(values[last, columns] / values[first, columns]) / _years_between(
+            dates[first], dates[last]
+        )
+    return pd.Series(np.where(valid.any(axis=0), rates, np.nan), index=prices.columns, name="rate")
+
+
+@instrumented
+def rolling_rates_cc(
+    prices,
+    window,
+    amount_column_name="amount",
+    date_column_name="date",
+    instrument_column_name="instrument",
+):
+    """Continuously compounded annual rates over trailing windows of window observations
+
+    prices is laid out as in annual_rates_cc. A wide frame gives a date x series pd.DataFrame whose rows are the
+    rates from window rows earlier, NaN if either price is missing; a long frame gives a pd.Series aligned with
+    its rows, the rate from the window-th earlier price of the same instrument. The first window observations
+    of every series are NaN.
+
+    """
+    if date_column_name in prices.columns:
+        order, _, amounts, dates, starts = _sorted_series(
+            prices, instrument_column_name, amount_column_name, date_column_name
+        )
+        lengths = segment_lengths(starts, len(amounts))
+        position = np.arange(len(amounts)) - np.repeat(starts, lengths)
+        current = np.flatnonzero(position >= window)
+        previous = current - window
+        sorted_rates = np.full(len(amounts), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sorted_rates[current] = np.log(amounts[current] / amounts[previous]) / _years_between(
+                dates[previous], dates[current]
+            )
+        rates = np.empty(len(amounts))
+        rates[order] = sorted_rates
+        return pd.Series(rates, index=prices.index, name="rate")
+
+    prices = prices.sort_index()
+    log_values = np.log(prices.to_numpy(dtype=float))
+    dates = np.asarray(prices.index).astype("datetime64[D]")
+    rates = np.full(log_values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates[window:] = (log_values[window:] - log_values[:-window]) / _years_between(
+            dates[:-window], dates[window:]
+        )[:, np.newaxis]
+    return pd.DataFrame(rates, index=prices.index, columns=prices.columns)
@@ -0,0 +1,195 @@
+import json
+import sqlite3
+import threading
+import time
+from hashlib import sha1
+
+from pyfinmod._lazy import lazy_import
+
+np = lazy_import("numpy")
+tables = lazy_import("tables")
+
+
+class BaseCache:
+    """Persistent cache of external API responses keyed by (ticker, datatype)
+
+    Parameters:
+    path : str
+        Location of the cache file
+    ttl : float, optional
+        Seconds after which an entry is considered stale and fetched again. Entries never expire if None
+    max_entries : int, optional
+        Maximum number of entries kept, the least recently used entries are evicted first
+    read_only : bool
+        Offline mode: entries are returned regardless of their age, nothing is written, and
+        Financials raises ParserError instead of fetching a missing entry
+
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None, read_only=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _expired(self, created):
+        return not self.read_only and self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, ticker, datatype):
+        """Return the cached JSON data or None if it is missing or expired"""
+        raise NotImplementedError
+
+    def set(self, ticker, datatype, json_data):
+        """Store JSON data, evicting the least recently used entries beyond max_entries"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class HDFCache(BaseCache):
+    """BaseCache stored in an HDF5 file, one uint8 array of JSON text per entry
+
+    HDF5 files should not be written by several processes at once, use SQLiteCache for that.
+
+    """
+
+    @staticmethod
+    def _node_name(ticker, datatype):
+        return "entry_" + sha1("{}/{}".format(ticker, datatype).encode()).hexdigest()
+
+    def _open(self, mode):
+        if mode == "r":
+            try:
+                return tables.open_file(self.path, mode="r")
+            except (IOError, OSError):
+                return None
+        return tables.open_file(self.path, mode=mode)
+
+    def get(self, ticker, datatype):
+        with self._lock:
+            h5 = self._open("r" if self.read_only else "a")
+            if h5 is None:
+                return None
+            with h5:
+                name = self._node_name(ticker, datatype)
+                if name not in h5.root:
+                    return None
+                node = h5.get_node(h5.root, name)
+                if self._expired(node.attrs.created):
+                    node.remove()
+                    return None
+                if not self.read_only:
+                    node.attrs.accessed = time.time()
+                return json.loads(node.read().tobytes().decode())
+
+    def set(self, ticker, datatype, json_data):
+        if self.read_only:
+            return
+        payload = np.frombuffer(json.dumps(json_data).encode(), dtype=np.uint8)
+        with self._lock, self._open("a") as h5:
+            name = self._node_name(ticker, datatype)
+            if name in h5.root:
+                h5.remove_node(h5.root, name)
+            node = h5.create_array(h5.root, name, obj=payload)
+            node.attrs.ticker = ticker
+            node.attrs.datatype = datatype
+            node.attrs.created = node.attrs.accessed = time.time()
+            if self.max_entries is not None:
+                entries = sorted(h5.list_nodes(h5.root), key=lambda n: n.attrs.accessed)
+                for entry in entries[: max(len(entries) - self.max_entries, 0)]:
+                    entry.remove()
+
+    def clear(self):
+        with self._lock, self._open("w"):
+            pass
+
+
+class SQLiteCache(BaseCache):
+    """BaseCache stored in a SQLite database, safe to share between processes"""
+
+    def __init__(self, path, ttl=None, max_entries=None, read_only=False):
+        super().__init__(path, ttl=ttl, max_entries=max_entries, read_only=read_only)
+        if not read_only:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS entries (ticker TEXT, datatype TEXT, payload TEXT, "
+                        "created REAL, accessed REAL, PRIMARY KEY (ticker, datatype))"
+                    )
+            finally:
+                connection.close()
+
+    def _connect(self):
+        if self.read_only:
+            return sqlite3.connect("file:{}?mode=ro".format(self.path), uri=True)
+        return sqlite3.connect(self.path)
+
+    def get(self, ticker, datatype):
+        try:
+            connection = self._connect()
+        except sqlite3.OperationalError:
+            return None
+        try:
+            with connection:
+                row = connection.execute(
+                    "SELECT payload, created FROM entries WHERE ticker = ? AND datatype = ?",
+                    (ticker, datatype),
+                ).fetchone()
+                if row is None:
+                    return None
+                payload, created = row
+                if self._expired(created):
+                    connection.execute(
+                        "DELETE FROM entries WHERE ticker = ? AND datatype = ?", (ticker, datatype)
+                    )
+                    return None
+                if not self.read_only:
+                    connection.execute(
+                        "UPDATE entries SET accessed = ? WHERE ticker = ? AND datatype = ?",
+                        (time.time(), ticker, datatype),
+                    )
+                return json.loads(payload)
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            connection.close()
+
+    def set(self, ticker, datatype, json_data):
+        if self.read_only:
+            return
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (ticker, datatype, json.dumps(json_data), now, now),
+                )
+                if self.max_entries is not None:
+                    connection.execute(
+                        "DELETE FROM entries WHERE rowid NOT IN "
+                        "(SELECT rowid FROM entries ORDER BY accessed DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+        finally:
+            connection.close()
+
+    def clear(self):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM entries")
+        finally:
+            connection.close()
@@ -0,0 +1,87 @@
+from pyfinmod._lazy import lazy_import
+from pyfinmod.constants import DAYS_IN_YEAR
+
+np = lazy_import("numpy")
+
+
+class YieldCurve:
+    """Term structure of annual zero rates with discount factors precomputed on a daily grid
+
+    Discount factors are interpolated log-linearly between tenors (flat forward rates), the zero rate of the
+    first tenor is used before it and the zero rate of the last tenor after it. Rates compound as in npv, a
+    cash flow days_passed days away is discounted by (1 + zero rate) ** -(days_passed / 365).
+
+    Parameters:
+    days : array-like
+        Tenors in days, ascending and positive
+    rates : array-like
+        Annual zero rates of the tenors
+    max_days : int, optional
+        Last day of the precomputed grid, the last tenor if None. Later days are extrapolated analytically
+
+    """
+
+    def __init__(self, days, rates, max_days=None):
+        self.days = np.asarray(days, dtype=float)
+        self.rates = np.asarray(rates, dtype=float)
+        if self.days.ndim != 1 or self.days.shape != self.rates.shape or not len(self.days):
+            raise ValueError("days and rates must be 1-D arrays of the same non-zero length")
+        if np.any(np.diff(self.days) <= 0) or self.days[0] <= 0:
+            raise ValueError("days must be positive and ascending")
+        self.max_days = int(np.ceil(self.days[-1] if max_days is None else max_days))
+        log_discount = -self.days / DAYS_IN_YEAR * np.log1p(self.rates)
+        # one day past max_days so that fractional days up to max_days interpolate within the grid
+        grid = np.arange(self.max_days + 2)
+        self._log_discount = np.where(
+            grid <= self.days[-1],
+            np.interp(grid, np.r_[0.0, self.days], np.r_[0.0, log_discount]),
+            -grid / DAYS_IN_YEAR * np.log1p(self.rates[-1]),
+        )
+
+    @classmethod
+    def flat(cls, rate, max_days=50 * DAYS_IN_YEAR):
+        return cls([max_days], [rate], max_days=max_days)
+
+    @property
+    def long_rate(self):
+        """Zero rate used beyond the last tenor"""
+        return self.rates[-1]
+
+    @property
+    def discount_factors(self):
+        """Discount factors of days 0 to max_days"""
+        return np.exp(self._log_discount[: self.max_days + 1])
+
+    def log_discount(self, days_passed):
+        """Log discount factors of non-negative, possibly fractional, days in one pass over the grid"""
+        days_passed = np.asarray(days_passed, dtype=float)
+        if np.any(days_passed < 0):
+            raise ValueError("days_passed must not be negative")
+        on_grid = days_passed <= self.max_days
+        lower = np.floor(np.where(on_grid, days_passed, 0)).astype(np.int64)
+        fraction = np.where(on_grid, days_passed, 0) - lower
+        interpolated = self._log_discount[lower] + fraction * (
+            self._log_discount[lower + 1] - self._log_discount[lower]
+        )
+        return np.where(
+            on_grid, interpolated, -days_passed / DAYS_IN_YEAR * np.log1p(self.long_rate)
+        )
+
+    def zero_rates(self, days_passed):
+        """Annual zero rates of days_passed, the first tenor's rate at day 0"""
+        days_passed = np.asarray(days_passed, dtype=float)
+        years = days_passed / DAYS_IN_YEAR
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.expm1(-self.log_discount(days_passed) / years)
+        return np.where(days_passed > 0, rates, self.rates[0])
+
+    def discount(self, days_passed, spread=0):
+        """Discount factors of days_passed, with spread added to the zero rates if it is not 0
+
+        spread broadcasts against days_passed.
+
+        """
+        if np.all(np.asarray(spread) == 0):
+            return np.exp(self.log_discount(days_passed))
+        days_passed = np.asarray(days_passed, dtype=float)
+        return (1 + self.zero_rates(days_passed) + spread) ** -(days_passed / DAYS_IN_YEAR)
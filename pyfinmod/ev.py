@@ -1,69 +1,144 @@
-from math import sqrt
-import pandas as pd
-from pyfinmod.basic import npv
+from pyfinmod._lazy import lazy_import
+from pyfinmod.constants import DAYS_IN_YEAR
+from pyfinmod.curve import YieldCurve
+from pyfinmod.instrumentation import instrumented
+from pyfinmod.universe import as_panel, line_item
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
+
+@instrumented
 def enterprise_value(balance_sheet):
+    balance_sheet = as_panel(balance_sheet)
     nvc = net_working_capital(balance_sheet)
-    nc_assets = balance_sheet.loc["Total non-current assets"]
-    other_assets = balance_sheet.loc["Other Assets"]
+    nc_assets = line_item(balance_sheet, "Total non-current assets")
+    other_assets = line_item(balance_sheet, "Other Assets")
     return nvc + nc_assets + other_assets
 
 
-def _net_working_capital(column):
+def _net_working_capital(balance_sheet):
     """
     Uses balance sheet to net working capital
     """
-    current_assets = column["Total current assets"]
-    current_liabilities = column["Total current liabilities"]
+    current_assets = line_item(balance_sheet, "Total current assets")
+    current_liabilities = line_item(balance_sheet, "Total current liabilities")
     return current_assets - current_liabilities
 
 
+@instrumented
 def net_working_capital(balance_sheet):
-    return balance_sheet.apply(_net_working_capital)
+    """Net working capital by date, a ticker x date pd.DataFrame for a panel or dictionary of balance sheets"""
+    return _net_working_capital(as_panel(balance_sheet))
 
 
-def _net_debt(column):
+def _net_debt(balance_sheet):
     """
     Uses balance sheet to get company net debt
     """
-    long_term_debt = column["Long-term debt"]
-    short_long_debt = column["Short-term debt"]
-    cash = column["Cash and cash equivalents"]
-    short_investments = column["Short-term investments"]
+    long_term_debt = line_item(balance_sheet, "Long-term debt")
+    short_long_debt = line_item(balance_sheet, "Short-term debt")
+    cash = line_item(balance_sheet, "Cash and cash equivalents")
+    short_investments = line_item(balance_sheet, "Short-term investments")
 
     return long_term_debt + short_long_debt - cash - short_investments
 
 
+@instrumented
 def net_debt(balance_sheet):
-    return balance_sheet.apply(_net_debt)
+    """Net debt by date, a ticker x date pd.DataFrame for a panel or dictionary of balance sheets"""
+    return _net_debt(as_panel(balance_sheet))
 
 
+@instrumented
 def enterprise_value_efficient_market(balance_sheet, market_cap):
+    """Market cap plus the most recent net debt
+
+    For a panel or dictionary of balance sheets market_cap is a pd.Series by ticker and the result is
+    aligned with it.
+
+    """
     nd = net_debt(balance_sheet)
+    if isinstance(nd, pd.DataFrame):
+        most_recent_net_debt = nd[sorted(nd.columns)].ffill(axis=1).iloc[:, -1]
+        return market_cap + most_recent_net_debt
     most_recent_net_debt = nd.loc[max(nd.index)]
     return market_cap + most_recent_net_debt
 
 
+@instrumented
 def fcf(cash_flow):
     return cash_flow.loc["Free Cash Flow"]
 
 
-def dcf(fcfs, wacc, short_term_growth, long_term_growth):
-    latest_fcf_date = fcfs.index.max()
-    dates = pd.date_range(latest_fcf_date, periods=6, freq="365D")[1:]
-    future_cash_flows = [fcfs[latest_fcf_date]]
-    for i in range(5): # 5?
-        next_year_fcf = future_cash_flows[-1] * (1 + short_term_growth)
-        future_cash_flows.append(next_year_fcf)
-    future_cash_flows = future_cash_flows[1:]
-    df = pd.DataFrame(data={"fcf": future_cash_flows, "date": dates})
-    # df.set_index('date', inplace=True)
-    df["terminal value"] = 0
-    last_index = df.index[-1]
-    last_short_term_fcf = df.at[last_index, "fcf"]
-    df.at[last_index, "terminal value"] = (
-        last_short_term_fcf * (1 + long_term_growth) / (wacc - long_term_growth)
+def _check_growth(wacc, long_term_growth):
+    if np.any(np.asarray(wacc) <= np.asarray(long_term_growth)):
+        raise ValueError("wacc must be greater than long_term_growth for the terminal value to converge")
+
+
+def _dcf_values(latest_fcf, wacc, short_term_growth, long_term_growth, years):
+    """Mid-year discounted FCFs projected for years with short_term_growth plus the terminal value
+
+    The sum of the projected FCFs is the closed form of a geometric series, so all arguments broadcast as
+    NumPy arrays without materializing the projection years.
+
+    """
+    wacc = np.asarray(wacc, dtype=float)
+    growth = 1 + np.asarray(short_term_growth, dtype=float)
+    years = np.asarray(years)
+    ratio = growth / (1 + wacc)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(ratio == 1, years, (1 - ratio ** years) / (1 - ratio))
+    last_fcf = latest_fcf * growth ** years
+    terminal_value = last_fcf * (1 + long_term_growth) / (wacc - long_term_growth)
+    # cash flows are discounted to the first projected year, then moved to mid-year
+    value = latest_fcf * growth * annuity + terminal_value / (1 + wacc) ** (years - 1)
+    return value * np.sqrt(1 + wacc)
+
+
+def _dcf_curve_value(latest_fcf, curve, short_term_growth, long_term_growth, years):
+    """_dcf_values discounting the projected year t at the zero rate of t - 1 years of a YieldCurve
+
+    The terminal value grows into perpetuity at the curve's long rate and the mid-year adjustment uses the
+    half-year discount factor, so a flat curve gives the same value as a flat wacc.
+
+    """
+    projected_years = np.arange(1, years + 1)
+    cash_flows = latest_fcf * (1 + short_term_growth) ** projected_years
+    cash_flows[-1] += cash_flows[-1] * (1 + long_term_growth) / (curve.long_rate - long_term_growth)
+    discounted = cash_flows * curve.discount((projected_years - 1) * DAYS_IN_YEAR)
+    return discounted.sum() / curve.discount(DAYS_IN_YEAR / 2)
+
+
+@instrumented
+def dcf(fcfs, wacc, short_term_growth, long_term_growth, years=5):
+    """Enterprise value of FCFs projected for years with short_term_growth plus the terminal value
+
+    wacc is a flat rate or a YieldCurve whose day 0 is the first projected year.
+
+    """
+    latest_fcf = fcfs[fcfs.index.max()]
+    if isinstance(wacc, YieldCurve):
+        _check_growth(wacc.long_rate, long_term_growth)
+        return float(_dcf_curve_value(latest_fcf, wacc, short_term_growth, long_term_growth, years))
+    _check_growth(wacc, long_term_growth)
+    return float(_dcf_values(latest_fcf, wacc, short_term_growth, long_term_growth, years))
+
+
+@instrumented
+def dcf_grid(fcfs, wacc, short_term_growth, long_term_growth, years=5):
+    """DCF sensitivity cube over every combination of the arguments
+
+    Each of wacc, short_term_growth, long_term_growth and years is a scalar or a 1-D array; the result has
+    shape (len(wacc), len(short_term_growth), len(long_term_growth), len(years)), scalars counting as one.
+
+    """
+    _check_growth(np.min(wacc), np.max(long_term_growth))
+    latest_fcf = fcfs[fcfs.index.max()]
+    grid = np.ix_(
+        np.atleast_1d(np.asarray(wacc, dtype=float)),
+        np.atleast_1d(np.asarray(short_term_growth, dtype=float)),
+        np.atleast_1d(np.asarray(long_term_growth, dtype=float)),
+        np.atleast_1d(np.asarray(years, dtype=int)),
     )
-    df["cash flow"] = df[["fcf", "terminal value"]].apply(sum, axis=1)
-    return npv(df, wacc) * sqrt((1 + wacc))
+    return _dcf_values(latest_fcf, *grid)
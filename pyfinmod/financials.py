@@ -1,7 +1,16 @@
+import re
+import codecs
+import time
+from json import JSONDecoder, JSONDecodeError
 from datetime import datetime
 from collections import defaultdict
-import requests
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pyfinmod._lazy import lazy_import
+from pyfinmod.instrumentation import emit
+
+requests = lazy_import("requests")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 
 class ParserError(Exception):
@@ -14,6 +23,12 @@ class Financials:
     Parameters:
     ticker : str
         Public company ticker to fetch the financial data of (e.g. 'AAPL')
+    cache : pyfinmod.cache.BaseCache, optional
+        Persistent cache of the API responses shared between Financials objects and processes
+    session : requests.Session, optional
+        Session to send the requests with, reusing its pooled keep-alive connections
+    scheduler : pyfinmod.scheduler.FetchScheduler, optional
+        Fetch layer shared between Financials objects which coalesces, rate limits and retries requests
 
     """
     base_url = "https://financialmodelingprep.com/api/v3/"
@@ -24,8 +39,13 @@ class Financials:
         "profile": base_url + "company/profile/{}?apikey=demo"
     }
 
-    def __init__(self, ticker):
+    statements = ["balance_sheet_statement", "cash_flow_statement", "income_statement"]
+
+    def __init__(self, ticker, cache=None, session=None, scheduler=None):
         self.ticker = ticker
+        self.cache = cache
+        self.session = session
+        self.scheduler = scheduler
         self._balance_sheet_statement = None
         self._cash_flow_statement = None
         self._income_statement = None
@@ -45,32 +65,181 @@ class Financials:
         To be used for balance_sheet_statement, cash_flow_statement, and income_statement only
 
         """
-        _r = defaultdict(list)
-        keys = [i for i in json[0].keys() if i != "date"]
-        _r["Items"] = keys
-        for row in json:
-            _r[Financials._date_parse(row["date"])] = [
-                float(v) for k, v in row.items() if k in keys
-            ]
-
-        df = pd.DataFrame.from_dict(_r)
-        df = df.set_index("Items")
+        return Financials._records_to_df(json)
+
+    @staticmethod
+    def _records_to_df(records):
+        """Convert an iterable of statement records (dictionaries with a "date" key) to pd.DataFrame
+
+        Values are written column by column into one float64 block which grows geometrically when the
+        number of records is not known in advance, and all dates are parsed in a single call.
+
+        """
+        capacity = len(records) if isinstance(records, (list, tuple)) else 16
+        keys = None
+        dates = []
+        for row in records:
+            if keys is None:
+                keys = [k for k in row.keys() if k != "date"]
+                values = np.empty((len(keys), capacity))
+            if len(dates) == values.shape[1]:
+                values = np.concatenate([values, np.empty_like(values)], axis=1)
+            values[:, len(dates)] = [row.get(k, "nan") for k in keys]
+            dates.append(row["date"])
+        if keys is None:
+            raise ParserError("No statement records to convert")
+
+        columns = pd.to_datetime(dates, format="%Y-%m-%d").date
+        df = pd.DataFrame(values[:, : len(dates)], index=pd.Index(keys, name="Items"), columns=columns)
         return df
 
+    @staticmethod
+    def _iter_json_records(stream, key="financials", chunk_size=2 ** 16):
+        """Incrementally decode the records of a JSON array from a text or binary file object
+
+        The array is either the whole document or the value of key in the top-level object. Only the
+        records being decoded are held in memory.
+
+        """
+        decoder = JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        eof = False
+
+        def read():
+            chunk = stream.read(chunk_size)
+            if isinstance(chunk, bytes):
+                chunk = text_decoder.decode(chunk, final=not chunk)
+            return chunk
+
+        array_start = re.compile(r'^\s*\[|"{}"\s*:\s*\['.format(re.escape(key)))
+        match = None
+        while match is None:
+            chunk = read()
+            if not chunk:
+                raise ParserError("No {} array found in the JSON stream".format(key))
+            buffer += chunk
+            match = array_start.search(buffer)
+        buffer = buffer[match.end():]
+
+        while True:
+            stripped = buffer.lstrip(" \t\n\r,")
+            if stripped.startswith("]"):
+                return
+            try:
+                record, end = decoder.raw_decode(stripped)
+            except JSONDecodeError as e:
+                if eof:
+                    raise ParserError("Truncated or invalid JSON stream {}".format(e))
+                chunk = read()
+                eof = not chunk
+                buffer = stripped + chunk
+                continue
+            buffer = stripped[end:]
+            yield record
+
+    @staticmethod
+    def statement_from_stream(stream, key="financials"):
+        """Convert a statement JSON document read incrementally from a file object or path to pd.DataFrame
+
+        Gives the same pd.DataFrame as the live API without loading the whole document at once.
+
+        """
+        if isinstance(stream, str):
+            with open(stream, "rb") as f:
+                return Financials._records_to_df(Financials._iter_json_records(f, key=key))
+        return Financials._records_to_df(Financials._iter_json_records(stream, key=key))
+
     def _fetch_json(self, datatype):
         """Fetch the requested datatype from the corresponding URL provided in self.datatype class variable
 
         """
+        if self.scheduler is not None:
+            url = self.datatypes[datatype].format(self.ticker)
+            return self.scheduler.fetch(self.ticker, datatype, url, session=self.session)
+        start = time.perf_counter()
         try:
             url = self.datatypes[datatype].format(self.ticker)
-            res = requests.get(url, timeout=5)
+            res = (self.session or requests).get(url, timeout=5)
         except requests.exceptions.RequestException as e:
+            emit("fetch", datatype, ticker=self.ticker, seconds=time.perf_counter() - start, bytes=0, error=e)
             raise ParserError("Failed to get data from external API {}".format(e))
-        else:
+        error = None
+        if res.status_code >= 400:
+            error = ParserError("External API responded with status {}".format(res.status_code))
+        try:
             json = res.json()
             if not json:
                 raise ParserError("Empty response from external API")
             return json
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            emit(
+                "fetch",
+                datatype,
+                ticker=self.ticker,
+                seconds=time.perf_counter() - start,
+                bytes=len(res.content),
+                error=error,
+            )
+
+    def _load_json(self, datatype):
+        """Return the requested datatype from the persistent cache if possible, otherwise fetch and cache it
+
+        """
+        if self.cache is None:
+            return self._fetch_json(datatype)
+        json = self.cache.get(self.ticker, datatype)
+        emit("cache", datatype, ticker=self.ticker, layer="persistent", hit=json is not None)
+        if json is not None:
+            return json
+        if self.cache.read_only:
+            raise ParserError("{} of {} is not in the read-only cache".format(datatype, self.ticker))
+        json = self._fetch_json(datatype)
+        self.cache.set(self.ticker, datatype, json)
+        return json
+
+    @staticmethod
+    def pooled_session(pool_size):
+        """Create a requests.Session keeping up to pool_size keep-alive connections per host
+
+        """
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def fetch_many(cls, tickers, datatypes=None, max_workers=8, cache=None, session=None, scheduler=None):
+        """Load the datatypes of many tickers concurrently
+
+        At most max_workers requests are in flight at once and all of them share the pooled connections of
+        session (a new pooled_session by default) and the optional scheduler. A failure only affects its own
+        ticker and datatype.
+
+        Returns a dictionary of Financials objects by ticker with the loaded datatypes cached, and a
+        dictionary of {datatype: exception} by ticker for the datatypes that failed.
+
+        """
+        datatypes = cls.statements + ["profile"] if datatypes is None else datatypes
+        session = cls.pooled_session(max_workers) if session is None else session
+        financials = {
+            ticker: cls(ticker, cache=cache, session=session, scheduler=scheduler) for ticker in tickers
+        }
+        errors = defaultdict(dict)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(getattr, financials[ticker], datatype): (ticker, datatype)
+                for ticker in financials
+                for datatype in datatypes
+            }
+        for future, (ticker, datatype) in futures.items():
+            if future.exception() is not None:
+                errors[ticker][datatype] = future.exception()
+        return financials, dict(errors)
 
     def __getattr__(self, name):
         """Return financial data stored as attribute
@@ -81,21 +250,26 @@ class Financials:
         Otherwise, attempt to search self.profile for the requested data and return the corresponding value if found.
 
         """
-        if name in ["balance_sheet_statement", "cash_flow_statement", "income_statement"]:
+        if name.startswith("_"):
+            # private and special names, e.g. looked up by pickle before __dict__ is restored
+            raise AttributeError(name)
+        if name in self.statements:
             cached_value = getattr(self, "_" + name, None)
+            emit("cache", name, ticker=self.ticker, layer="attribute", hit=cached_value is not None)
             if cached_value is not None:
                 return cached_value
             else:
-                json_data = self._fetch_json(name)["financials"]
+                json_data = self._load_json(name)["financials"]
                 df = self._json_to_df(json_data)
                 setattr(self, "_" + name, df)
                 return df
         elif name in ["profile"]:
             cached_value = getattr(self, "_" + name, None)
+            emit("cache", name, ticker=self.ticker, layer="attribute", hit=cached_value is not None)
             if cached_value is not None:
                 return cached_value
             else:
-                json_data = self._fetch_json(name)["profile"]
+                json_data = self._load_json(name)["profile"]
                 setattr(self, "_" + name, json_data)
                 return json_data
         else:
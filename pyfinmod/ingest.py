@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import tarfile
+import zipfile
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+
+from pyfinmod.financials import Financials, ParserError
+from pyfinmod.universe import Universe
+
+# datatype of each file name suffix of the dumps, e.g. aapl_balance_sheet.json
+DUMP_DATATYPES = {
+    "balance_sheet": "balance_sheet_statement",
+    "cash_flow": "cash_flow_statement",
+    "income_statement": "income_statement",
+    "summary": "profile",
+}
+
+_dump_name = re.compile(r"^(?P<ticker>.+)_(?P<kind>{})\.json$".format("|".join(DUMP_DATATYPES)))
+
+
+def _match(path):
+    match = _dump_name.match(os.path.basename(path))
+    if match is None:
+        return None
+    return match.group("ticker").upper(), DUMP_DATATYPES[match.group("kind")]
+
+
+def _iter_dumps(path):
+    """Yield (ticker, datatype, source) of every dump file
+
+    path is a directory, searched recursively, or a .zip, .tar, .tar.gz, .tgz or .tar.bz2 archive. source is
+    a file path, ("zip", archive path, member name) or ("tar", archive path, offset, size) so that workers
+    read their own members; members of compressed tar archives cannot be read out of order and are read here
+    as bytes.
+
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                key = _match(name)
+                if key is not None:
+                    yield key + (os.path.join(root, name),)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+        for name in names:
+            key = _match(name)
+            if key is not None:
+                yield key + (("zip", path, name),)
+    elif tarfile.is_tarfile(path):
+        try:
+            archive = tarfile.open(path, "r:")
+            compressed = False
+        except tarfile.ReadError:
+            archive = tarfile.open(path)
+            compressed = True
+        with archive:
+            for member in archive:
+                key = _match(member.name)
+                if key is None or not member.isfile():
+                    continue
+                if compressed:
+                    yield key + (archive.extractfile(member).read(),)
+                else:
+                    yield key + (("tar", path, member.offset_data, member.size),)
+    else:
+        raise ParserError("{} is neither a directory nor a zip or tar archive".format(path))
+
+
+@lru_cache(maxsize=4)
+def _zip_archive(path):
+    """Zip archives stay open in every process so that the central directory is read once"""
+    return zipfile.ZipFile(path)
+
+
+def _read_dump(source):
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if source[0] == "zip":
+        return _zip_archive(source[1]).read(source[2])
+    _, path, offset, size = source
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def _parse_dump(task):
+    """Parse one dump like Financials.__getattr__ parses the API responses, returning any error instead"""
+    ticker, datatype, source = task
+    try:
+        data = json.loads(_read_dump(source))
+        if datatype == "profile":
+            return ticker, datatype, data.get("profile", data), None
+        records = data["financials"] if isinstance(data, dict) else data
+        return ticker, datatype, Financials._json_to_df(records), None
+    except Exception as e:
+        return ticker, datatype, None, ParserError("Failed to parse {} of {}: {!r}".format(datatype, ticker, e))
+
+
+def _parse_dumps(path, processes, chunksize):
+    tasks = _iter_dumps(path)
+    try:
+        if processes == 1:
+            for task in tasks:
+                yield _parse_dump(task)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+
+        # executor.map submits all of its tasks at once, so tasks are submitted in batches to bound the
+        # number of members read by this process ahead of the workers
+        batch_size = 4 * (processes or os.cpu_count() or 1) * chunksize
+        with ProcessPoolExecutor(processes) as executor:
+            while True:
+                batch = list(islice(tasks, batch_size))
+                if not batch:
+                    return
+                for result in executor.map(_parse_dump, batch, chunksize=chunksize):
+                    yield result
+    finally:
+        _zip_archive.cache_clear()
+
+
+def load_financials(path, processes=None, chunksize=16, financials_class=Financials):
+    """Fill Financials objects from a directory or archive of JSON dumps without touching the network
+
+    Dump files are named {ticker}_{balance_sheet|cash_flow|income_statement|summary}.json and hold either the
+    API response or its bare "financials" list. Files are parsed by a pool of processes (os.cpu_count() if
+    processes is None, none if it is 1) and the results are set as the already loaded datatypes of the
+    objects. Datatypes without a dump are still fetched when accessed.
+
+    Returns a dictionary of Financials objects by ticker and a dictionary of {datatype: exception} by ticker
+    for the dumps that failed to parse, as Financials.fetch_many.
+
+    """
+    financials = {}
+    errors = defaultdict(dict)
+    for ticker, datatype, value, error in _parse_dumps(path, processes, chunksize):
+        if ticker not in financials:
+            financials[ticker] = financials_class(ticker)
+        if error is not None:
+            errors[ticker][datatype] = error
+        else:
+            setattr(financials[ticker], "_" + datatype, value)
+    return financials, dict(errors)
+
+
+def load_universe(path, processes=None, chunksize=16, dtype="float64"):
+    """Build a Universe from the statement dumps of a directory or archive, see load_financials
+
+    Returns the Universe and the dictionary of errors by ticker.
+
+    """
+    frames = defaultdict(dict)
+    errors = defaultdict(dict)
+    for ticker, datatype, value, error in _parse_dumps(path, processes, chunksize):
+        if error is not None:
+            errors[ticker][datatype] = error
+        elif datatype in Universe.statements:
+            frames[ticker][datatype] = value
+    return Universe.from_frames(frames, dtype=dtype), dict(errors)
@@ -0,0 +1,117 @@
+import functools
+import threading
+import time
+from collections import defaultdict
+
+from pyfinmod._lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+_hooks = []
+
+
+def add_hook(hook):
+    """Register hook(event, name, fields) to be called on every instrumentation event
+
+    Events are "call" for the instrumented basic, ev and wacc functions (fields: seconds), "fetch" for
+    Financials._fetch_json and every FetchScheduler attempt (fields: ticker, seconds, bytes, error), "retry"
+    before a FetchScheduler retry (fields: ticker, attempt, seconds of delay, error of the last attempt) and
+    "cache" for Financials lookups (fields: ticker, layer which is "attribute", "persistent" or "in-flight"
+    for requests coalesced by FetchScheduler, hit).
+
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def emit(event, name, **fields):
+    for hook in list(_hooks):
+        hook(event, name, fields)
+
+
+def instrumented(func):
+    """Report the wall time of every call of func as a "call" event while hooks are registered
+
+    Without hooks the only overhead is one extra function call and an empty list check.
+
+    """
+    name = "{}.{}".format(func.__module__.split(".")[-1], func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _hooks:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            emit("call", name, seconds=time.perf_counter() - start)
+
+    return wrapper
+
+
+class MetricsCollector:
+    """In-process hook aggregating instrumentation events
+
+    Use as a context manager, or register it with add_hook and unregister it with remove_hook.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._calls = defaultdict(lambda: [0, 0.0])
+            self._fetches = defaultdict(lambda: [0, 0.0, 0, 0])
+            self._cache = defaultdict(lambda: [0, 0])
+
+    def __call__(self, event, name, fields):
+        with self._lock:
+            if event == "call":
+                stats = self._calls[name]
+                stats[0] += 1
+                stats[1] += fields["seconds"]
+            elif event == "fetch":
+                stats = self._fetches[name]
+                stats[0] += 1
+                stats[1] += fields["seconds"]
+                stats[2] += fields["bytes"]
+                stats[3] += fields["error"] is not None
+            elif event == "cache":
+                self._cache[fields["layer"]][0 if fields["hit"] else 1] += 1
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *args):
+        remove_hook(self)
+
+    @property
+    def call_stats(self):
+        """Number of calls and total seconds by function"""
+        with self._lock:
+            return pd.DataFrame.from_dict(
+                dict(self._calls), orient="index", columns=["calls", "seconds"]
+            ).sort_index()
+
+    @property
+    def fetch_stats(self):
+        """Number of requests, total seconds, bytes received and errors by datatype"""
+        with self._lock:
+            return pd.DataFrame.from_dict(
+                dict(self._fetches), orient="index", columns=["requests", "seconds", "bytes", "errors"]
+            ).sort_index()
+
+    @property
+    def cache_stats(self):
+        """Hits, misses and hit rate of the Financials attribute and persistent caches"""
+        with self._lock:
+            df = pd.DataFrame.from_dict(dict(self._cache), orient="index", columns=["hits", "misses"])
+        df["hit rate"] = df["hits"] / (df["hits"] + df["misses"])
+        return df.sort_index()
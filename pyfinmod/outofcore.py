@@ -0,0 +1,200 @@
+import os
+import tempfile
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod._segments import epoch_days, segment_lengths
+from pyfinmod.constants import DAYS_IN_YEAR
+from pyfinmod.portfolio import _segment_npv, _solve_irr
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+tables = lazy_import("tables")
+
+COLUMNS = ("instrument", "cash_flow", "date")
+
+
+def append_hdf(path, instruments, cash_flows, dates, node="cash_flows"):
+    """Append cash flows to a table of an HDF5 store, creating the store and the table if needed
+
+    Dates are stored as int64 days since 1970-01-01. Instrument ids must be integers.
+
+    """
+    rows = np.empty(
+        len(cash_flows),
+        dtype=[("instrument", np.int64), ("cash_flow", np.float64), ("date", np.int64)],
+    )
+    rows["instrument"] = instruments
+    rows["cash_flow"] = cash_flows
+    rows["date"] = epoch_days(dates)
+    with tables.open_file(path, mode="a") as h5:
+        if "/" + node in h5:
+            h5.get_node("/" + node).append(rows)
+        else:
+            h5.create_table(h5.root, node, obj=rows, filters=tables.Filters(complevel=5, complib="blosc"))
+
+
+def open_npy(directory):
+    """Memory-map instrument.npy, cash_flow.npy and date.npy of a directory as a dict of arrays"""
+    return {column: np.load(os.path.join(directory, column + ".npy"), mmap_mode="r") for column in COLUMNS}
+
+
+def _iter_hdf_chunks(path, node, chunk_size):
+    with tables.open_file(path, mode="r") as h5:
+        table = h5.get_node("/" + node)
+        for start in range(0, table.nrows, chunk_size):
+            rows = table.read(start, start + chunk_size)
+            yield rows["instrument"], rows["cash_flow"], rows["date"]
+
+
+def _iter_array_chunks(columns, chunk_size):
+    instruments, cash_flows, dates = (columns[column] for column in COLUMNS)
+    for start in range(0, len(cash_flows), chunk_size):
+        stop = start + chunk_size
+        yield np.asarray(instruments[start:stop]), np.asarray(cash_flows[start:stop]), dates[start:stop]
+
+
+def iter_chunks(source, chunk_size=1000000, node="cash_flows"):
+    """Read (instruments, cash flows, days since epoch) array chunks of a cash flow store
+
+    source is the path of an HDF5 file with an (instrument, cash_flow, date) table at node, a directory of
+    .npy files read by open_npy, or a dict of such arrays, e.g. np.memmap.
+
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            chunks = _iter_array_chunks(open_npy(source), chunk_size)
+        else:
+            chunks = _iter_hdf_chunks(source, node, chunk_size)
+    else:
+        chunks = _iter_array_chunks(source, chunk_size)
+    for instruments, cash_flows, dates in chunks:
+        yield instruments, np.asarray(cash_flows, dtype=float), epoch_days(dates)
+
+
+def _iter_groups(chunks):
+    """Re-chunk so that no instrument is split between chunks
+
+    The trailing instrument of every chunk is carried over to the next chunk, so memory is bounded by the
+    chunk size plus the cash flows of the largest instrument.
+
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = tuple(np.concatenate([c, a]) for c, a in zip(carry, chunk))
+        instruments = chunk[0]
+        if not len(instruments):
+            continue
+        boundaries = np.flatnonzero(instruments[1:] != instruments[:-1])
+        last_start = boundaries[-1] + 1 if len(boundaries) else 0
+        if last_start:
+            yield tuple(a[:last_start] for a in chunk)
+        carry = tuple(a[last_start:] for a in chunk)
+    if carry is not None:
+        yield carry
+
+
+def _check_grouped(instruments, seen):
+    """Raise ValueError if an instrument of a chunk from _iter_groups was seen before, return the updated ids
+
+    seen is the sorted array of the instruments of the previous chunks, None before the first chunk.
+
+    """
+    ids = instruments[np.r_[True, instruments[1:] != instruments[:-1]]]
+    unique_ids = np.unique(ids)
+    if seen is None:
+        seen = unique_ids[:0]
+    positions = np.searchsorted(seen, unique_ids)
+    reappearing = positions < len(seen)
+    reappearing[reappearing] = seen[positions[reappearing]] == unique_ids[reappearing]
+    if len(unique_ids) != len(ids) or reappearing.any():
+        raise ValueError("Cash flows are not grouped by instrument, pass grouped=False to group them out of core")
+    return np.union1d(seen, unique_ids)
+
+
+def _iter_partitioned(chunks, partitions):
+    """Group the chunks by instrument through partitions temporary files
+
+    Rows are appended to the files of their instrument id modulo partitions, then every partition is read
+    back and sorted by instrument on its own, so memory is bounded by the largest partition.
+
+    """
+    dtypes = (np.int64, np.float64, np.int64)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [
+            [os.path.join(directory, "{}_{}".format(column, i)) for column in COLUMNS] for i in range(partitions)
+        ]
+        for chunk in chunks:
+            chunk = [np.asarray(a, dtype=dtype) for a, dtype in zip(chunk, dtypes)]
+            partition = chunk[0] % partitions
+            order = np.argsort(partition, kind="stable")
+            bounds = np.searchsorted(partition[order], np.arange(partitions + 1))
+            for i in np.flatnonzero(np.diff(bounds)):
+                rows = order[bounds[i]: bounds[i + 1]]
+                for path, a in zip(paths[i], chunk):
+                    with open(path, "ab") as f:
+                        a[rows].tofile(f)
+        for partition_paths in paths:
+            if not os.path.exists(partition_paths[0]):
+                continue
+            instruments, cash_flows, days = (
+                np.fromfile(path, dtype=dtype) for path, dtype in zip(partition_paths, dtypes)
+            )
+            order = np.argsort(instruments, kind="stable")
+            yield instruments[order], cash_flows[order], days[order]
+
+
+def _valuate(instruments, cash_flows, days, annual_discount_rate, guess, bracket, tol, maxiter):
+    starts = np.flatnonzero(np.r_[True, instruments[1:] != instruments[:-1]])
+    lengths = segment_lengths(starts, len(instruments))
+    years = (days - np.repeat(np.minimum.reduceat(days, starts), lengths)) / DAYS_IN_YEAR
+    result = {}
+    if annual_discount_rate is not None:
+        rates = np.broadcast_to(np.asarray(annual_discount_rate, dtype=float), starts.shape)
+        result["npv"], _ = _segment_npv(cash_flows, years, starts, rates)
+    if guess is not None:
+        result["irr"], result["converged"] = _solve_irr(cash_flows, years, starts, guess, bracket, tol, maxiter)
+    return pd.DataFrame(result, index=pd.Index(instruments[starts], name="instrument"))
+
+
+def iter_valuations(
+    source,
+    annual_discount_rate=None,
+    guess=0.1,
+    chunk_size=1000000,
+    node="cash_flows",
+    bracket=(-0.99, 10.0),
+    tol=1e-10,
+    maxiter=100,
+    grouped=True,
+    partitions=64,
+):
+    """NPV and IRR of every instrument of a cash flow store larger than memory, one pd.DataFrame per chunk
+
+    The store is read chunk_size rows at a time. If grouped is True, the rows of an instrument must be
+    contiguous (e.g. sorted by instrument id) and ValueError is raised when an instrument reappears after
+    other instruments. Otherwise the rows are first spread over partitions temporary files by instrument id,
+    which must be integers, and one pd.DataFrame is yielded per partition. The dates of an instrument need
+    not be sorted. Each NPV is discounted to the instrument's earliest date as in npv, IRRs are solved as in
+    portfolio.batch_irr. The "npv" column is left out if annual_discount_rate is None and the "irr" and
+    "converged" columns if guess is None.
+
+    """
+    chunks = iter_chunks(source, chunk_size, node)
+    if grouped:
+        groups = _iter_groups(chunks)
+    else:
+        groups = _iter_partitioned(chunks, partitions)
+    seen = None
+    for instruments, cash_flows, days in groups:
+        if grouped:
+            seen = _check_grouped(instruments, seen)
+        yield _valuate(instruments, cash_flows, days, annual_discount_rate, guess, bracket, tol, maxiter)
+
+
+def valuations(source, annual_discount_rate=None, guess=0.1, chunk_size=1000000, node="cash_flows", **kwargs):
+    """iter_valuations concatenated into one pd.DataFrame indexed by instrument"""
+    frames = list(iter_valuations(source, annual_discount_rate, guess, chunk_size, node, **kwargs))
+    if not frames:
+        return pd.DataFrame(index=pd.Index([], name="instrument"))
+    return pd.concat(frames)
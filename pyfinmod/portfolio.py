@@ -0,0 +1,349 @@
+from functools import partial
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod._segments import segment_lengths, sort_segments, to_datetime64
+from pyfinmod.basic import convert_ir, discount_factors, _flat_payment
+from pyfinmod.constants import DAYS_IN_YEAR
+from pyfinmod.curve import YieldCurve
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _group_cash_flows(
+    dataframe, instrument_column_name, cash_flow_column_name, date_column_name
+):
+    """Sort a long frame by (instrument, date) and split it into contiguous segments
+
+    Returns instrument labels, cash flows, days passed since each instrument's earliest date
+    and the start offset of every segment.
+
+    """
+    dates = to_datetime64(dataframe[date_column_name])
+    order, labels, starts = sort_segments(dataframe[instrument_column_name], dates)
+    dates = dates[order]
+    cash_flows = np.asarray(dataframe[cash_flow_column_name], dtype=float)[order]
+    lengths = segment_lengths(starts, len(order))
+    days_passed = (dates - np.repeat(dates[starts], lengths)) // np.timedelta64(1, "D")
+    return labels, cash_flows, days_passed, starts
+
+
+def _segment_npv(cash_flows, years, starts, rates, base_rates=0):
+    """NPV and its derivative with respect to the rate for every segment
+
+    base_rates are added per cash flow, e.g. the zero rates of a curve when solving for a spread.
+
+    """
+    growth = base_rates + 1 + np.repeat(rates, segment_lengths(starts, len(cash_flows)))
+    discounted = cash_flows * growth ** -years
+    value = np.add.reduceat(discounted, starts)
+    derivative = np.add.reduceat(-years * discounted / growth, starts)
+    return value, derivative
+
+
+def _solve_irr(cash_flows, years, starts, guess, bracket, tol, maxiter, base_rates=0):
+    """Vectorized Newton iterations with a bisection fallback for the series Newton did not solve"""
+    segment_npv = partial(_segment_npv, cash_flows, years, starts, base_rates=base_rates)
+    rates = np.broadcast_to(np.asarray(guess, dtype=float), starts.shape).copy()
+    converged = np.zeros(starts.shape, dtype=bool)
+    with np.errstate(all="ignore"):
+        for _ in range(maxiter):
+            value, derivative = segment_npv(rates)
+            step = value / derivative
+            valid = np.isfinite(step) & ~converged
+            step = np.where(valid, step, 0)
+            new_rates = rates - step
+            # never step past -100%, move half way towards it instead
+            new_rates = np.where(new_rates <= -1, (rates - 1) / 2, new_rates)
+            rates = np.where(converged, rates, new_rates)
+            converged |= valid & (np.abs(step) < tol)
+            if converged.all():
+                break
+
+        unsolved = ~converged
+        if unsolved.any():
+            low = np.full(starts.shape, bracket[0], dtype=float)
+            high = np.full(starts.shape, bracket[1], dtype=float)
+            value_low, _ = segment_npv(low)
+            value_high, _ = segment_npv(high)
+            bisect = unsolved & (np.sign(value_low) != np.sign(value_high))
+            for _ in range(maxiter):
+                middle = (low + high) / 2
+                value_middle, _ = segment_npv(middle)
+                same_sign = np.sign(value_middle) == np.sign(value_low)
+                low = np.where(same_sign, middle, low)
+                value_low = np.where(same_sign, value_middle, value_low)
+                high = np.where(same_sign, high, middle)
+                if np.all(high[bisect] - low[bisect] < tol):
+                    break
+            rates = np.where(bisect, (low + high) / 2, rates)
+            converged |= bisect & (high - low < tol)
+            rates = np.where(converged, rates, np.nan)
+    return rates, converged
+
+
+def batch_irr(
+    dataframe,
+    guess=0.1,
+    instrument_column_name="instrument",
+    cash_flow_column_name="cash flow",
+    date_column_name="date",
+    bracket=(-0.99, 10.0),
+    tol=1e-10,
+    maxiter=100,
+):
+    """Internal rate of returns of many cash flow series solved together
+
+    dataframe is a long frame with one row per cash flow and an instrument id column. All series are solved
+    with the same vectorized Newton iterations; series Newton fails on are bisected within bracket.
+
+    Returns a pd.DataFrame indexed by instrument with "irr" and "converged" columns.
+
+    """
+    labels, cash_flows, days_passed, starts = _group_cash_flows(
+        dataframe, instrument_column_name, cash_flow_column_name, date_column_name
+    )
+    rates, converged = _solve_irr(
+        cash_flows, days_passed / DAYS_IN_YEAR, starts, guess, bracket, tol, maxiter
+    )
+    index = pd.Index(labels, name=instrument_column_name)
+    return pd.DataFrame({"irr": rates, "converged": converged}, index=index)
+
+
+def _grouped_npv(cash_flows, days_passed, starts, annual_discount_rate, index, cache=False):
+    if isinstance(annual_discount_rate, YieldCurve):
+        discounted = cash_flows * annual_discount_rate.discount(days_passed)
+        return np.add.reduceat(discounted, starts)
+    if cache and np.ndim(annual_discount_rate) == 0:
+        discounted = cash_flows * discount_factors(annual_discount_rate, days_passed, cache=True)
+        return np.add.reduceat(discounted, starts)
+    if isinstance(annual_discount_rate, pd.Series):
+        annual_discount_rate = annual_discount_rate.reindex(index).to_numpy(dtype=float)
+    rates = np.broadcast_to(np.asarray(annual_discount_rate, dtype=float), starts.shape)
+    value, _ = _segment_npv(cash_flows, days_passed / DAYS_IN_YEAR, starts, rates)
+    return value
+
+
+def _payback(cash_flows, days_passed, starts):
+    """Years from the earliest date until the cumulative cash flow of every segment is no longer negative"""
+    lengths = segment_lengths(starts, len(cash_flows))
+    cumulative = np.cumsum(cash_flows)
+    cumulative -= np.repeat(cumulative[starts] - cash_flows[starts], lengths)
+    # cash flows on the same date count together, so payback is only reached on the last flow of a date
+    last_of_date = np.r_[days_passed[1:] != days_passed[:-1], True]
+    last_of_date[starts[1:] - 1] = True
+    positions = np.where((cumulative >= 0) & last_of_date, np.arange(len(cash_flows)), len(cash_flows))
+    first = np.minimum.reduceat(positions, starts)
+    paid_back = first < starts + lengths
+    payback = np.full(starts.shape, np.nan)
+    payback[paid_back] = days_passed[first[paid_back]] / DAYS_IN_YEAR
+    return payback
+
+
+def batch_npv(
+    dataframe,
+    annual_discount_rate,
+    instrument_column_name="instrument",
+    cash_flow_column_name="cash flow",
+    date_column_name="date",
+    cache=False,
+):
+    """Net present values of many cash flow series, each discounted to its earliest date
+
+    annual_discount_rate is a flat rate, a pd.Series of rates by instrument or a YieldCurve; a curve is
+    interpolated once for all cash flows. With cache=True the discount factors of a flat rate are reused by
+    later calls on the same dates, see basic.discount_factors. Returns a pd.Series of NPVs indexed by
+    instrument.
+
+    """
+    labels, cash_flows, days_passed, starts = _group_cash_flows(
+        dataframe, instrument_column_name, cash_flow_column_name, date_column_name
+    )
+    index = pd.Index(labels, name=instrument_column_name)
+    value = _grouped_npv(cash_flows, days_passed, starts, annual_discount_rate, index, cache=cache)
+    return pd.Series(value, index=index, name="npv")
+
+
+def batch_valuation(
+    dataframe,
+    annual_discount_rate,
+    guess=0.1,
+    instrument_column_name="instrument",
+    cash_flow_column_name="cash flow",
+    date_column_name="date",
+    bracket=(-0.99, 10.0),
+    tol=1e-10,
+    maxiter=100,
+):
+    """NPV, IRR, payback and total cash flow of every instrument of a long frame in one pass
+
+    The frame is sorted by (instrument, date) once and every measure is a reduction over the instrument
+    segments: npv as in batch_npv, irr and converged as in batch_irr, payback in years from the earliest date
+    until the cumulative cash flow is no longer negative (NaN if it never is) and the undiscounted total.
+
+    """
+    labels, cash_flows, days_passed, starts = _group_cash_flows(
+        dataframe, instrument_column_name, cash_flow_column_name, date_column_name
+    )
+    index = pd.Index(labels, name=instrument_column_name)
+    rates, converged = _solve_irr(
+        cash_flows, days_passed / DAYS_IN_YEAR, starts, guess, bracket, tol, maxiter
+    )
+    return pd.DataFrame(
+        {
+            "npv": _grouped_npv(cash_flows, days_passed, starts, annual_discount_rate, index),
+            "irr": rates,
+            "converged": converged,
+            "payback": _payback(cash_flows, days_passed, starts),
+            "total cash flow": np.add.reduceat(cash_flows, starts),
+        },
+        index=index,
+    )
+
+
+def batch_spread(
+    dataframe,
+    curve,
+    guess=0.0,
+    instrument_column_name="instrument",
+    cash_flow_column_name="cash flow",
+    date_column_name="date",
+    bracket=(-0.99, 10.0),
+    tol=1e-10,
+    maxiter=100,
+):
+    """Spreads over the zero rates of a YieldCurve which make the NPV of each cash flow series zero
+
+    The batch_irr solver with the curve interpolated once for all cash flows. Returns a pd.DataFrame indexed by
+    instrument with "spread" and "converged" columns.
+
+    """
+    labels, cash_flows, days_passed, starts = _group_cash_flows(
+        dataframe, instrument_column_name, cash_flow_column_name, date_column_name
+    )
+    spreads, converged = _solve_irr(
+        cash_flows,
+        days_passed / DAYS_IN_YEAR,
+        starts,
+        guess,
+        bracket,
+        tol,
+        maxiter,
+        base_rates=curve.zero_rates(days_passed),
+    )
+    index = pd.Index(labels, name=instrument_column_name)
+    return pd.DataFrame({"spread": spreads, "converged": converged}, index=index)
+
+
+def batch_irr_padded(
+    cash_flows, dates, guess=0.1, bracket=(-0.99, 10.0), tol=1e-10, maxiter=100
+):
+    """Internal rate of returns of series stored as rows of padded 2-D arrays
+
+    cash_flows is a (series, periods) float array padded with NaN and dates is an array of the same shape
+    padded with NaT. Returns (irr, converged) arrays with one value per row; empty rows are not converged.
+
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    dates = to_datetime64(dates)
+    mask = ~np.isnan(cash_flows) & ~np.isnat(dates)
+    counts = mask.sum(axis=1)
+    non_empty = counts > 0
+    starts = np.cumsum(counts[non_empty]) - counts[non_empty]
+
+    first_dates = np.fmin.reduce(np.where(mask, dates, np.datetime64("NaT")), axis=1)
+    first_dates = np.repeat(first_dates[non_empty], counts[non_empty])
+    days_passed = (dates[mask] - first_dates) // np.timedelta64(1, "D")
+
+    rates = np.full(len(cash_flows), np.nan)
+    converged = np.zeros(len(cash_flows), dtype=bool)
+    guess = np.broadcast_to(np.asarray(guess, dtype=float), rates.shape)[non_empty]
+    rates[non_empty], converged[non_empty] = _solve_irr(
+        cash_flows[mask],
+        days_passed / DAYS_IN_YEAR,
+        starts,
+        guess,
+        bracket,
+        tol,
+        maxiter,
+    )
+    return rates, converged
+
+
+def _periodic_interest(annual_interest_rate, period):
+    """Convert annual rates to per-period rates where period may be an array of period names"""
+    return convert_ir(annual_interest_rate, from_period="year", to_period=period)
+
+
+def _amortization_schedule_frame(principal, periodic_interest, term, first_loan):
+    term = term.astype(np.int64)
+    payment = _flat_payment(principal, periodic_interest, term)
+    size = int(term.sum())
+    starts = np.cumsum(term) - term
+    loan = np.repeat(np.arange(len(term)), term)
+    periods_passed = np.arange(size) - np.repeat(starts, term)
+
+    interest = periodic_interest[loan]
+    growth = (1 + interest) ** periods_passed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paid_off = np.where(
+            interest == 0, periods_passed, (growth - 1) / interest
+        )
+    principal_left = principal[loan] * growth - payment[loan] * paid_off
+    current_interest = principal_left * interest
+    return pd.DataFrame(
+        {
+            "loan": (loan + first_loan).astype(np.int32),
+            "period": (periods_passed + 1).astype(np.int32),
+            "principal at the beginning of period": principal_left,
+            "payment at the end of period": payment[loan],
+            "interest": current_interest,
+            "return of principal": payment[loan] - current_interest,
+        }
+    )
+
+
+def iter_amortization_schedules(
+    principal, annual_interest_rate, term, period="year", chunk_size=10000
+):
+    """Yield flat payment schedules of many loans as long-format frames of at most chunk_size loans each
+
+    principal, annual_interest_rate, term and period broadcast as NumPy arrays, one element per loan.
+    Every row is one period of one loan, the "loan" column is the position of the loan in the inputs.
+
+    """
+    principal, annual_interest_rate, term = np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(annual_interest_rate, dtype=float),
+        np.asarray(term, dtype=int),
+    )
+    periodic_interest = np.broadcast_to(
+        _periodic_interest(annual_interest_rate, period), principal.shape
+    )
+    principal = principal.ravel()
+    periodic_interest = periodic_interest.ravel()
+    term = term.ravel()
+    for first_loan in range(0, len(term), chunk_size):
+        chunk = slice(first_loan, first_loan + chunk_size)
+        yield _amortization_schedule_frame(
+            principal[chunk], periodic_interest[chunk], term[chunk], first_loan
+        )
+
+
+def amortization_schedules(principal, annual_interest_rate, term, period="year"):
+    """Flat payment schedules of many loans in a single long-format pd.DataFrame
+
+    The columnar counterpart of basic.flat_payments, see iter_amortization_schedules for the arguments.
+
+    """
+    principal, annual_interest_rate, term = np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(annual_interest_rate, dtype=float),
+        np.asarray(term, dtype=int),
+    )
+    for schedule in iter_amortization_schedules(
+        principal, annual_interest_rate, term, period, chunk_size=max(term.size, 1)
+    ):
+        return schedule
+    # no loans, no chunks
+    return _amortization_schedule_frame(np.empty(0), np.empty(0), np.empty(0, dtype=int), 0)
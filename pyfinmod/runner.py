@@ -0,0 +1,182 @@
+import os
+import time
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod.ev import enterprise_value, net_debt, fcf, dcf
+from pyfinmod.financials import Financials
+from pyfinmod.store import StatementStore
+from pyfinmod.wacc import wacc as weighted_average_cost_of_capital
+
+pd = lazy_import("pandas")
+
+
+def _latest(values):
+    return float(values.loc[max(values.index)])
+
+
+class ValuationSpec:
+    """Valuation of one ticker: latest enterprise value and net debt, WACC and DCF enterprise value
+
+    A spec is called with the statements of a ticker by statement name and its profile, and returns a
+    dictionary of results. Any picklable callable with the same signature can be used by run_valuations.
+
+    Parameters:
+    risk_free_interest_rate, market_return : float
+        Rates of the CAPM cost of equity
+    short_term_growth, long_term_growth : float
+        FCF growth rates of the dcf
+    years : int
+        Years of projected FCFs of the dcf
+    wacc : float or pyfinmod.curve.YieldCurve, optional
+        Discount rate of the dcf, computed with wacc from the profile's mktCap and beta if None
+
+    """
+
+    def __init__(
+        self,
+        risk_free_interest_rate=0.02,
+        market_return=0.08,
+        short_term_growth=0.08,
+        long_term_growth=0.04,
+        years=5,
+        wacc=None,
+    ):
+        self.risk_free_interest_rate = risk_free_interest_rate
+        self.market_return = market_return
+        self.short_term_growth = short_term_growth
+        self.long_term_growth = long_term_growth
+        self.years = years
+        self.wacc = wacc
+
+    def __call__(self, statements, profile):
+        balance_sheet = statements["balance_sheet_statement"]
+        wacc = self.wacc
+        if wacc is None:
+            wacc = weighted_average_cost_of_capital(
+                float(profile["mktCap"]),
+                balance_sheet,
+                statements["income_statement"],
+                float(profile["beta"]),
+                self.risk_free_interest_rate,
+                self.market_return,
+            )
+        return {
+            "enterprise value": _latest(enterprise_value(balance_sheet)),
+            "net debt": _latest(net_debt(balance_sheet)),
+            "wacc": wacc,
+            "dcf": dcf(
+                fcf(statements["cash_flow_statement"]),
+                wacc,
+                self.short_term_growth,
+                self.long_term_growth,
+                self.years,
+            ),
+        }
+
+
+def _value_ticker(spec, ticker, source, profiles, cache):
+    profile = profiles.get(ticker) if profiles is not None else None
+    if isinstance(source, StatementStore):
+        return spec(source.frames(ticker), profile)
+    financials = source[ticker] if source is not None else Financials(ticker, cache=cache)
+    statements = {statement: getattr(financials, statement) for statement in Financials.statements}
+    return spec(statements, financials.profile if profile is None else profile)
+
+
+def _run_chunk(arguments):
+    """Value a chunk of tickers, returning (ticker, result, error, seconds) of every ticker"""
+    spec, tickers, source, profiles, cache = arguments
+    results = []
+    for ticker in tickers:
+        start = time.perf_counter()
+        try:
+            result, error = _value_ticker(spec, ticker, source, profiles, cache), None
+        except Exception as e:
+            result, error = None, e
+        results.append((ticker, result, error, time.perf_counter() - start))
+    return results
+
+
+def _chunk_arguments(tickers, spec, source, profiles, cache):
+    if isinstance(source, StatementStore) or source is None:
+        chunk_source = source
+    else:
+        chunk_source = {ticker: source[ticker] for ticker in tickers if ticker in source}
+    if profiles is not None:
+        profiles = {ticker: profiles[ticker] for ticker in tickers if ticker in profiles}
+    return spec, tickers, chunk_source, profiles, cache
+
+
+def run_valuations(
+    tickers,
+    spec=None,
+    source=None,
+    profiles=None,
+    cache=None,
+    processes=None,
+    chunk_size=None,
+):
+    """Value every ticker with spec on a pool of processes
+
+    Statements come from source, a StatementStore attached zero-copy by the workers or a dictionary of
+    Financials objects by ticker (e.g. from ingest.load_financials); if source is None every worker fetches
+    them with Financials and the optional cache. Profiles (mktCap and beta) come from the profiles dictionary
+    by ticker, otherwise from the Financials profile.
+
+    Tickers are scheduled in chunks of chunk_size, by default about four chunks per process, on processes
+    worker processes (os.cpu_count() if None, none if 1). A failing ticker does not affect the others.
+
+    Returns a pd.DataFrame of results by ticker, a dictionary of exceptions by ticker and a pd.Series of
+    throughput statistics.
+
+    """
+    spec = ValuationSpec() if spec is None else spec
+    tickers = list(tickers)
+    processes = os.cpu_count() if processes is None else processes
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(tickers) // (processes * 4)))
+    chunks = [tickers[start: start + chunk_size] for start in range(0, len(tickers), chunk_size)]
+
+    start = time.perf_counter()
+    chunk_results = []
+    if processes == 1:
+        for chunk in chunks:
+            chunk_results.append(_run_chunk(_chunk_arguments(chunk, spec, source, profiles, cache)))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [
+                (chunk, executor.submit(_run_chunk, _chunk_arguments(chunk, spec, source, profiles, cache)))
+                for chunk in chunks
+            ]
+            for chunk, future in futures:
+                if future.exception() is not None:
+                    chunk_results.append([(ticker, None, future.exception(), 0.0) for ticker in chunk])
+                else:
+                    chunk_results.append(future.result())
+    seconds = time.perf_counter() - start
+
+    results, errors = {}, {}
+    worker_seconds = 0.0
+    for ticker, result, error, ticker_seconds in (row for rows in chunk_results for row in rows):
+        worker_seconds += ticker_seconds
+        if error is None:
+            results[ticker] = result
+        else:
+            errors[ticker] = error
+    results = pd.DataFrame.from_dict(results, orient="index")
+    results.index.name = "ticker"
+    stats = pd.Series(
+        {
+            "tickers": len(tickers),
+            "succeeded": len(results),
+            "failed": len(errors),
+            "processes": processes,
+            "chunks": len(chunks),
+            "seconds": seconds,
+            "worker seconds": worker_seconds,
+            "tickers per second": len(tickers) / seconds if seconds else float("nan"),
+        }
+    )
+    return results, errors, stats
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod.financials import ParserError
+from pyfinmod.instrumentation import emit
+
+requests = lazy_import("requests")
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing rate acquisitions per second with bursts of up to capacity"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = max(rate, 1) if capacity is None else capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchScheduler:
+    """Shared fetch layer of Financials objects coalescing, rate limiting and retrying API requests
+
+    Concurrent fetches of the same (ticker, datatype) share one outstanding request. Requests are started
+    at most rate times per second (in bursts of up to burst) and transient failures, i.e. connection errors
+    and retry_statuses responses, are retried up to retries times after a random delay of up to
+    backoff * 2 ** attempt seconds (at most max_backoff, at least a numeric Retry-After header).
+    ParserError is raised once the retries are used up or for a non-transient failure.
+
+    Parameters:
+    rate : float, optional
+        Requests per second, unlimited if None
+    burst : int, optional
+        Capacity of the token bucket, rate by default
+    retries : int
+        Retries after the first attempt
+    session : requests.Session, optional
+        Session used when the Financials object has none
+
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        burst=None,
+        retries=3,
+        backoff=0.5,
+        max_backoff=30.0,
+        retry_statuses=(429, 500, 502, 503, 504),
+        session=None,
+    ):
+        self.bucket = None if rate is None else TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.session = session
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _delay(self, attempt, response):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff))
+        return delay
+
+    def _request(self, ticker, datatype, url, session):
+        error = None
+        response = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self._delay(attempt - 1, response)
+                emit("retry", datatype, ticker=ticker, attempt=attempt, seconds=delay, error=error)
+                time.sleep(delay)
+            if self.bucket is not None:
+                self.bucket.acquire()
+            start = time.perf_counter()
+            response = None
+            try:
+                response = (session or self.session or requests).get(url, timeout=5)
+            except requests.exceptions.RequestException as e:
+                error = e
+            else:
+                if response.status_code in self.retry_statuses:
+                    error = ParserError("External API responded with status {}".format(response.status_code))
+                else:
+                    error = None
+            emit(
+                "fetch",
+                datatype,
+                ticker=ticker,
+                seconds=time.perf_counter() - start,
+                bytes=len(response.content) if response is not None else 0,
+                error=error,
+            )
+            if error is None:
+                break
+        else:
+            raise ParserError(
+                "Failed to get data from external API after {} attempts {}".format(self.retries + 1, error)
+            )
+
+        if response.status_code >= 400:
+            raise ParserError("External API responded with status {}".format(response.status_code))
+        try:
+            json = response.json()
+        except ValueError as e:
+            raise ParserError("Invalid response from external API {}".format(e))
+        if not json:
+            raise ParserError("Empty response from external API")
+        return json
+
+    def fetch(self, ticker, datatype, url, session=None):
+        """Return the JSON data of url, joining the outstanding request of (ticker, datatype) if there is one"""
+        key = (ticker, datatype)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        emit("cache", datatype, ticker=ticker, layer="in-flight", hit=not leader)
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(self._request(ticker, datatype, url, session))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
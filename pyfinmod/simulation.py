@@ -0,0 +1,174 @@
+from pyfinmod._lazy import lazy_import
+from pyfinmod.ev import _dcf_values
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class _Summary:
+    """Streaming summary of simulated values: moments, extremes and a fixed-bin histogram"""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.histogram = np.zeros(len(edges) - 1, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+
+    def add(self, values):
+        if not len(values):
+            return self
+        chunk = _Summary(self.edges)
+        chunk.count = len(values)
+        chunk.mean = values.mean()
+        chunk.m2 = ((values - chunk.mean) ** 2).sum()
+        chunk.min = values.min()
+        chunk.max = values.max()
+        chunk.histogram = np.histogram(values, bins=self.edges)[0]
+        chunk.below = int((values < self.edges[0]).sum())
+        chunk.above = int((values > self.edges[-1]).sum())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram += other.histogram
+        self.below += other.below
+        self.above += other.above
+        return self
+
+    def quantile(self, q):
+        """Quantile interpolated linearly within the histogram bin it falls into"""
+        rank = q * self.count
+        if rank <= self.below:
+            return self.min
+        if rank >= self.count - self.above:
+            return self.max
+        cumulative = self.below + np.cumsum(self.histogram)
+        i = int(np.searchsorted(cumulative, rank))
+        previous = cumulative[i - 1] if i else self.below
+        fraction = (rank - previous) / max(cumulative[i] - previous, 1)
+        value = self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i])
+        return min(max(value, self.min), self.max)
+
+    def describe(self, quantiles):
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        data = {"count": self.count, "mean": self.mean, "std": std, "min": self.min}
+        for q in quantiles:
+            data["{:g}%".format(q * 100)] = self.quantile(q)
+        data["max"] = self.max
+        return pd.Series(data)
+
+
+def _simulate_values(seed_sequence, scenarios, parameters):
+    """Enterprise values of one chunk of scenarios; scenarios with wacc <= long term growth are dropped"""
+    rng = np.random.default_rng(seed_sequence)
+    wacc = rng.normal(parameters["wacc"], parameters["wacc_sd"], scenarios)
+    short_term_growth = rng.normal(
+        parameters["short_term_growth"], parameters["short_term_growth_sd"], scenarios
+    )
+    long_term_growth = rng.normal(
+        parameters["long_term_growth"], parameters["long_term_growth_sd"], scenarios
+    )
+    latest_fcf = parameters["latest_fcf"] * np.exp(rng.normal(0, parameters["fcf_sd"], scenarios))
+    valid = (wacc > long_term_growth) & (wacc > -1)
+    return _dcf_values(
+        latest_fcf[valid],
+        wacc[valid],
+        short_term_growth[valid],
+        long_term_growth[valid],
+        parameters["years"],
+    )
+
+
+def _simulate_chunk(arguments):
+    seed_sequence, scenarios, parameters, edges = arguments
+    return _Summary(edges).add(_simulate_values(seed_sequence, scenarios, parameters))
+
+
+def simulate_dcf(
+    fcfs,
+    wacc,
+    short_term_growth,
+    long_term_growth,
+    years=5,
+    wacc_sd=0.01,
+    short_term_growth_sd=0.02,
+    long_term_growth_sd=0.005,
+    fcf_sd=0.1,
+    net_debt=0,
+    shares=None,
+    scenarios=1000000,
+    chunk_size=100000,
+    seed=None,
+    processes=None,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    bins=10000,
+):
+    """Monte Carlo distribution of the dcf enterprise value
+
+    Every scenario draws normal WACC, short and long term growth around the given values and a lognormal
+    shock of the latest FCF. Scenarios are simulated in chunks with independent generators spawned from seed,
+    so results do not depend on processes, the number of worker processes (chunks run in this process if
+    None). Each chunk is reduced to moments and a histogram with bins fixed by the first chunk, so memory does
+    not grow with the number of scenarios; quantiles are interpolated from the histogram.
+
+    Returns a pd.DataFrame in the layout of pd.DataFrame.describe with an "enterprise value" column and, if
+    shares is given, a "value per share" column of (enterprise value - net_debt) / shares. Scenarios with
+    wacc <= long term growth have no terminal value and are not counted.
+
+    """
+    parameters = {
+        "latest_fcf": fcfs[fcfs.index.max()],
+        "wacc": wacc,
+        "wacc_sd": wacc_sd,
+        "short_term_growth": short_term_growth,
+        "short_term_growth_sd": short_term_growth_sd,
+        "long_term_growth": long_term_growth,
+        "long_term_growth_sd": long_term_growth_sd,
+        "fcf_sd": fcf_sd,
+        "years": years,
+    }
+    chunk_sizes = [chunk_size] * (scenarios // chunk_size)
+    if scenarios % chunk_size:
+        chunk_sizes.append(scenarios % chunk_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    first_values = _simulate_values(seed_sequences[0], chunk_sizes[0], parameters)
+    # bins cover the bulk of the first chunk, the heavy tail near wacc == long term growth falls outside them
+    low, high = np.quantile(first_values, [0.0005, 0.9995]) if len(first_values) else (0.0, 0.0)
+    margin = max(high - low, abs(high) * 1e-6, 1e-9) / 2
+    edges = np.linspace(low - margin, high + margin, bins + 1)
+    summary = _Summary(edges).add(first_values)
+
+    chunks = [
+        (seed_sequence, size, parameters, edges)
+        for seed_sequence, size in zip(seed_sequences[1:], chunk_sizes[1:])
+    ]
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes) as executor:
+            for chunk_summary in executor.map(_simulate_chunk, chunks):
+                summary.merge(chunk_summary)
+    else:
+        for chunk in chunks:
+            summary.merge(_simulate_chunk(chunk))
+
+    result = pd.DataFrame({"enterprise value": summary.describe(quantiles)})
+    if shares is not None:
+        per_share = (result["enterprise value"] - net_debt) / shares
+        per_share["count"] = summary.count
+        per_share["std"] = result.at["std", "enterprise value"] / shares
+        result["value per share"] = per_share
+    return result
@@ -0,0 +1,149 @@
+import os
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod.financials import Financials
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class StatementStore:
+    """Statements of many tickers in one float64 buffer shared between processes without copies
+
+    Every (ticker, statement) is a contiguous item x date block of the buffer, with its item names and dates
+    kept in index arrays next to it. The buffer is a memory-mapped file if path is given, otherwise a
+    multiprocessing.shared_memory block. Pickling a store only pickles the index arrays and the name of the
+    buffer, so worker processes attach to the same memory and statement() returns pd.DataFrame views of it
+    laid out as the Financials attributes.
+
+    Use StatementStore.create to build a store; the process which created it should call unlink() when done.
+    Views must be released before close() or unlink() for a shared memory buffer to be unmapped.
+
+    """
+
+    statements = Financials.statements
+
+    def __init__(self, blocks, items, dates, size, path=None, shm_name=None, create=False):
+        self.blocks = blocks
+        self.items = items
+        self.dates = dates
+        self.size = size
+        self.path = path
+        self.shm_name = shm_name
+        self._shm = None
+        self._attach(create=create)
+
+    def _attach(self, create=False):
+        if self.path is not None:
+            mode = "w+" if create else "r"
+            self._values = np.memmap(self.path, dtype=np.float64, mode=mode, shape=(max(self.size, 1),))
+            return
+        from multiprocessing import shared_memory
+
+        if create:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1) * 8)
+            self.shm_name = self._shm.name
+        else:
+            self._shm = shared_memory.SharedMemory(name=self.shm_name)
+        self._values = np.ndarray((self.size,), dtype=np.float64, buffer=self._shm.buf)
+        if not create:
+            self._values.flags.writeable = False
+
+    @classmethod
+    def create(cls, frames, path=None):
+        """Copy {ticker: {statement name: item x date pd.DataFrame}} into a new store"""
+        blocks, items, dates = {}, [], []
+        size = 0
+        for ticker, ticker_frames in frames.items():
+            for statement, df in ticker_frames.items():
+                n_items, n_dates = df.shape
+                blocks[ticker, statement] = (size, n_items, n_dates, len(items), len(dates))
+                items.extend(df.index)
+                dates.extend(df.columns)
+                size += n_items * n_dates
+        store = cls(
+            blocks,
+            np.array(items, dtype=object),
+            np.array(dates, dtype="datetime64[D]"),
+            size,
+            path=path,
+            create=True,
+        )
+        for ticker, ticker_frames in frames.items():
+            for statement, df in ticker_frames.items():
+                store._block(ticker, statement)[:] = df.to_numpy(dtype=np.float64)
+        if path is not None:
+            store._values.flush()
+            store._attach()
+        else:
+            store._values.flags.writeable = False
+        return store
+
+    @classmethod
+    def from_financials(cls, financials, path=None):
+        """Build a store from Financials objects, fetching statements which are not loaded yet"""
+        return cls.create(
+            {f.ticker: {statement: getattr(f, statement) for statement in cls.statements} for f in financials},
+            path=path,
+        )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_values"], state["_shm"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = None
+        self._attach()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def tickers(self):
+        return sorted({ticker for ticker, _ in self.blocks})
+
+    def _block(self, ticker, statement):
+        offset, n_items, n_dates, _, _ = self.blocks[ticker, statement]
+        return self._values[offset: offset + n_items * n_dates].reshape(n_items, n_dates)
+
+    def statement(self, ticker, statement):
+        """Read-only item x date pd.DataFrame view of a statement, laid out as the Financials attribute"""
+        _, n_items, n_dates, item_start, date_start = self.blocks[ticker, statement]
+        index = pd.Index(self.items[item_start: item_start + n_items], name="Items")
+        columns = pd.Index(self.dates[date_start: date_start + n_dates].astype(object))
+        return pd.DataFrame(self._block(ticker, statement), index=index, columns=columns, copy=False)
+
+    def frames(self, ticker):
+        """Statements of one ticker by statement name"""
+        return {statement: self.statement(ticker, statement) for t, statement in self.blocks if t == ticker}
+
+    def close(self):
+        """Detach this process from the buffer; views returned before must not be used afterwards"""
+        self._values = None
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # views are still alive, the buffer is unmapped when they are garbage collected
+                pass
+            self._shm = None
+
+    def unlink(self):
+        """Close and free the buffer, in the process which created the store"""
+        if self.path is not None:
+            self.close()
+            os.remove(self.path)
+            return
+        shm = self._shm
+        if shm is None:
+            from multiprocessing import shared_memory
+
+            shm = shared_memory.SharedMemory(name=self.shm_name)
+            shm.close()
+        self.close()
+        shm.unlink()
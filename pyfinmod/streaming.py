@@ -0,0 +1,144 @@
+from itertools import islice
+from math import exp, log1p
+
+from pyfinmod._lazy import lazy_import
+from pyfinmod._segments import epoch_days
+from pyfinmod.constants import DAYS_IN_YEAR
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# anchor of instruments without cash flows, the largest int64
+_NO_ANCHOR = 2 ** 63 - 1
+
+
+class NPVAccumulator:
+    """Running NPVs of cash flow feeds, each discounted to the earliest date of its instrument as in npv
+
+    The state of an instrument is its anchor date, its NPV at the anchor and its number of cash flows. A cash
+    flow dated after the anchor is discounted to it and added; an earlier one becomes the new anchor and the
+    NPV is rebased by multiplying it with the discount factor between the old and the new anchor, so the
+    history is never rescanned.
+
+    Parameters:
+    annual_discount_rate : float
+        Rate the cash flows are discounted at, compounded as in npv
+
+    """
+
+    def __init__(self, annual_discount_rate):
+        self.annual_discount_rate = annual_discount_rate
+        self._log_growth = log1p(annual_discount_rate) / DAYS_IN_YEAR
+        self._positions = {}
+        self._instruments = []
+        self._anchor = np.full(16, _NO_ANCHOR, dtype=np.int64)
+        self._value = np.zeros(16)
+        self._count = np.zeros(16, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._instruments)
+
+    def _position(self, instrument):
+        position = self._positions.get(instrument)
+        if position is None:
+            position = self._positions[instrument] = len(self._instruments)
+            self._instruments.append(instrument)
+            if position == len(self._anchor):
+                self._anchor = np.r_[self._anchor, np.full(position, _NO_ANCHOR, dtype=np.int64)]
+                self._value = np.r_[self._value, np.zeros(position)]
+                self._count = np.r_[self._count, np.zeros(position, dtype=np.int64)]
+        return position
+
+    def add(self, cash_flow, date, instrument=None):
+        """Add one cash flow"""
+        day = int(epoch_days([date])[0])
+        position = self._position(instrument)
+        anchor = int(self._anchor[position])
+        if day < anchor:
+            if anchor != _NO_ANCHOR:
+                self._value[position] *= exp(-(anchor - day) * self._log_growth)
+            self._anchor[position] = anchor = day
+        self._value[position] += cash_flow * exp(-(day - anchor) * self._log_growth)
+        self._count[position] += 1
+        return self
+
+    def _add_arrays(self, instruments, cash_flows, days):
+        codes, labels = pd.factorize(instruments, use_na_sentinel=False)
+        # factorize turns None into NaN, missing instruments are kept under None as in add
+        positions = np.array(
+            [self._position(None if label is None or label != label else label) for label in labels],
+            dtype=np.int64,
+        )
+        first_days = np.full(len(labels), _NO_ANCHOR, dtype=np.int64)
+        np.minimum.at(first_days, codes, days)
+
+        old_anchors = self._anchor[positions]
+        new_anchors = np.minimum(old_anchors, first_days)
+        rebased = old_anchors != _NO_ANCHOR
+        self._value[positions[rebased]] *= np.exp(
+            -(old_anchors[rebased] - new_anchors[rebased]) * self._log_growth
+        )
+        self._anchor[positions] = new_anchors
+
+        discounted = cash_flows * np.exp(-(days - new_anchors[codes]) * self._log_growth)
+        self._value[: len(self)] += np.bincount(positions[codes], weights=discounted, minlength=len(self))
+        self._count[: len(self)] += np.bincount(positions[codes], minlength=len(self))
+
+    def update(
+        self,
+        flows,
+        instrument_column_name="instrument",
+        cash_flow_column_name="cash flow",
+        date_column_name="date",
+        chunk_size=10000,
+    ):
+        """Add a micro-batch or a stream of cash flows
+
+        flows is a pd.DataFrame or a dict of arrays with instrument, cash flow and date columns (the instrument
+        column is optional, flows without one or with a missing instrument are added to the instrument None as
+        by add), or any iterable, e.g. a generator, of (instrument, cash flow, date) tuples which is
+        consumed in chunks of chunk_size.
+
+        """
+        if isinstance(flows, (pd.DataFrame, dict)):
+            cash_flows = np.asarray(flows[cash_flow_column_name], dtype=float)
+            if instrument_column_name in flows:
+                instruments = np.asarray(flows[instrument_column_name], dtype=object)
+            else:
+                instruments = np.full(len(cash_flows), None, dtype=object)
+            if len(cash_flows):
+                self._add_arrays(instruments, cash_flows, epoch_days(flows[date_column_name]))
+            return self
+
+        flows = iter(flows)
+        while True:
+            chunk = list(islice(flows, chunk_size))
+            if not chunk:
+                return self
+            instruments, cash_flows, dates = zip(*chunk)
+            self._add_arrays(
+                np.fromiter(instruments, dtype=object, count=len(instruments)),
+                np.asarray(cash_flows, dtype=float),
+                epoch_days(dates),
+            )
+
+    def npv(self, instrument=None):
+        """NPV of one instrument discounted to its earliest date"""
+        return float(self._value[self._positions[instrument]])
+
+    @property
+    def npvs(self):
+        """pd.Series of NPVs by instrument"""
+        return pd.Series(self._value[: len(self)].copy(), index=pd.Index(self._instruments, name="instrument"))
+
+    @property
+    def anchors(self):
+        """pd.Series of the earliest date by instrument"""
+        return pd.Series(
+            self._anchor[: len(self)].astype("datetime64[D]").astype("datetime64[ns]"),
+            index=pd.Index(self._instruments, name="instrument"),
+        )
+
+    @property
+    def counts(self):
+        return pd.Series(self._count[: len(self)].copy(), index=pd.Index(self._instruments, name="instrument"))
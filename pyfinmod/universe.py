@@ -0,0 +1,137 @@
+from pyfinmod._lazy import lazy_import
+from pyfinmod.financials import Financials
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def as_panel(statements):
+    """Concatenate a dictionary of item x date statements by ticker into one (ticker, item) x date pd.DataFrame
+
+    Any other input is returned unchanged.
+
+    """
+    if isinstance(statements, dict):
+        return pd.concat(statements, names=["ticker"])
+    return statements
+
+
+def line_item(statement, item):
+    """Return the date row of an item x date statement, or the ticker x date rows of a panel"""
+    if statement.index.nlevels > 1:
+        return statement.xs(item, level=-1)
+    return statement.loc[item]
+
+
+def _stack(frames, dtype):
+    """Stack item x date frames of many tickers into one (ticker, item, date) pd.Series"""
+    tickers, items, dates, values = [], [], [], []
+    for ticker, df in frames.items():
+        n_items, n_dates = df.shape
+        tickers.append(np.repeat(np.array([ticker], dtype=object), n_items * n_dates))
+        items.append(np.repeat(np.asarray(df.index, dtype=object), n_dates))
+        dates.append(np.tile(np.asarray(df.columns, dtype="datetime64[D]"), n_items))
+        values.append(df.to_numpy(dtype=dtype).ravel())
+    if not values:
+        return pd.Series(
+            [],
+            dtype=dtype,
+            index=pd.MultiIndex.from_arrays([[], [], []], names=["ticker", "item", "date"]),
+        )
+    index = pd.MultiIndex.from_arrays(
+        [
+            pd.Categorical(np.concatenate(tickers)),
+            pd.Categorical(np.concatenate(items), categories=pd.unique(np.concatenate(items))),
+            pd.DatetimeIndex(np.concatenate(dates)),
+        ],
+        names=["ticker", "item", "date"],
+    )
+    return pd.Series(np.concatenate(values), index=index).sort_index()
+
+
+class Universe:
+    """Statements of many tickers stacked into (ticker, item, date) panels
+
+    Every statement is a pd.Series of values indexed by a sorted (ticker, item, date) pd.MultiIndex with
+    categorical ticker and item levels, so one item or one date is sliced across all tickers at once.
+
+    Parameters:
+    panels : dict
+        (ticker, item, date) pd.Series by statement name (e.g. 'balance_sheet_statement')
+
+    """
+
+    statements = Financials.statements
+
+    def __init__(self, panels):
+        self.panels = panels
+
+    @classmethod
+    def from_frames(cls, frames, dtype="float64"):
+        """Build a Universe from {ticker: {statement name: item x date pd.DataFrame}}
+
+        dtype "float32" halves the memory of the values.
+
+        """
+        panels = {}
+        for statement in cls.statements:
+            statement_frames = {
+                ticker: ticker_frames[statement]
+                for ticker, ticker_frames in frames.items()
+                if statement in ticker_frames
+            }
+            panels[statement] = _stack(statement_frames, dtype)
+        return cls(panels)
+
+    @classmethod
+    def from_financials(cls, financials, dtype="float64"):
+        """Build a Universe from Financials objects, fetching statements which are not loaded yet"""
+        frames = {
+            f.ticker: {statement: getattr(f, statement) for statement in cls.statements}
+            for f in financials
+        }
+        return cls.from_frames(frames, dtype=dtype)
+
+    @property
+    def tickers(self):
+        tickers = set()
+        for panel in self.panels.values():
+            tickers.update(panel.index.get_level_values("ticker").unique())
+        return sorted(tickers)
+
+    def panel(self, statement):
+        """(ticker, item, date) pd.Series of a statement"""
+        return self.panels[statement]
+
+    def _statement_of(self, item):
+        for statement, panel in self.panels.items():
+            if item in panel.index.levels[1]:
+                return statement
+        raise KeyError(item)
+
+    def item(self, item, statement=None):
+        """ticker x date pd.DataFrame of one item across all tickers"""
+        panel = self.panels[statement or self._statement_of(item)]
+        return panel.xs(item, level="item").unstack("date")
+
+    def on(self, date, statement):
+        """ticker x item pd.DataFrame of a statement at one date across all tickers"""
+        return self.panels[statement].xs(pd.Timestamp(date), level="date").unstack("item")
+
+    def frame(self, statement):
+        """(ticker, item) x date pd.DataFrame of a statement, newest dates first as in Financials"""
+        df = self.panels[statement].unstack("date")
+        df = df.iloc[:, ::-1]
+        df.columns = df.columns.date
+        return df
+
+    def statement(self, ticker, statement):
+        """item x date pd.DataFrame of one ticker laid out as the corresponding Financials attribute"""
+        panel = self.panels[statement].xs(ticker, level="ticker")
+        items = panel.index.get_level_values("item").unique()
+        df = panel.unstack("date").reindex(items.astype(object))
+        df = df.iloc[:, ::-1]
+        df.columns = df.columns.date
+        df.index.name = "Items"
+        df.columns.name = None
+        return df
@@ -1,52 +1,70 @@
-from statistics import mean
-import pandas as pd
+from pyfinmod._lazy import lazy_import
+from pyfinmod.instrumentation import instrumented
+from pyfinmod.universe import as_panel, line_item
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
-def _company_tax_rate(column):
+
+def _company_tax_rate(income_statement):
     """ Uses income statement to get company tax rate """
-    income_before_tax = column["Earnings before Tax"]
-    income_tax_expense = column["Income Tax Expense"]
+    income_before_tax = line_item(income_statement, "Earnings before Tax")
+    income_tax_expense = line_item(income_statement, "Income Tax Expense")
     return income_tax_expense / income_before_tax
 
 
-def _company_total_debt(column):
+def _company_total_debt(balance_sheet):
     """ Uses balance sheet to get company total debt rate """
-    long_term_debt = column["Long-term debt"]
-    short_long_debt = column["Short-term debt"]
+    long_term_debt = line_item(balance_sheet, "Long-term debt")
+    short_long_debt = line_item(balance_sheet, "Short-term debt")
     return long_term_debt + short_long_debt
 
 
+@instrumented
 def tax_rate(income_statement):
-    return income_statement.apply(_company_tax_rate)
+    return _company_tax_rate(as_panel(income_statement))
 
 
+@instrumented
 def total_debt(balance_sheet):
-    return balance_sheet.apply(_company_total_debt)
+    return _company_total_debt(as_panel(balance_sheet))
+
+
+def _average_debt(debt):
+    """Average of the debt at each date and at the previous (next column) date of the same company"""
+    if isinstance(debt, pd.Series):
+        return (debt + debt.shift(-1)) / 2
+    # companies report at different dates, so the previous date is looked up in the long format
+    long_debt = debt.stack().sort_index(level=[0, 1], ascending=[True, False])
+    tickers = long_debt.index.get_level_values(0)
+    previous = long_debt.shift(-1).where(np.append(tickers[1:] == tickers[:-1], False))
+    return ((long_debt + previous) / 2).unstack()
 
 
+def _cost_of_debt(debt, income_statement):
+    average_debt = _average_debt(debt)
+    interest_paid = -1 * line_item(income_statement, "Interest Expense")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = (interest_paid / average_debt).where(average_debt != 0, 0)
+    return res.where(average_debt.notna() & interest_paid.notna()).dropna(how="all")
+
+
+@instrumented
 def cost_of_debt(balance_sheet, income_statement):
-    debt = total_debt(balance_sheet)
-    averages = [mean(pair) for pair in zip(debt[:-1], debt[1:])]
-    average_debt = pd.Series(averages, index=debt.index[:-1])
-    average_debt.name = "average debt"
-    interest_paid = -1 * income_statement.loc["Interest Expense", :]
-    interest_paid.name = "interest paid"
-    debt_and_interest = pd.concat([average_debt, interest_paid], axis=1)
-
-    debt_and_interest.dropna(inplace=True)
-    res = debt_and_interest.apply(
-        lambda x: float(x["interest paid"]) / float(x["average debt"])
-        if x["average debt"]
-        else 0,
-        axis=1,
-    )
-    return res
+    """Interest paid over the average debt of two consecutive periods
 
+    For a panel or dictionary of statements a ticker x date pd.DataFrame is returned.
 
+    """
+    return _cost_of_debt(total_debt(balance_sheet), as_panel(income_statement))
+
+
+@instrumented
 def cost_of_equity(beta, risk_free_interest_rate, market_return):
     return risk_free_interest_rate + beta * (market_return - risk_free_interest_rate)
 
 
+@instrumented
 def wacc(
     equity,
     balance_sheet,
@@ -55,10 +73,22 @@ def wacc(
     risk_free_interest_rate,
     market_return,
 ):
+    """Weighted average cost of capital averaged over the statement dates
+
+    For a panel or dictionary of statements of many companies, equity and beta are pd.Series by ticker and a
+    pd.Series of WACC by ticker is returned.
+
+    """
+    balance_sheet = as_panel(balance_sheet)
+    income_statement = as_panel(income_statement)
     debt = total_debt(balance_sheet)
     tax_rate_for_wacc = tax_rate(income_statement)
-    rd = cost_of_debt(balance_sheet, income_statement)
+    rd = _cost_of_debt(debt, income_statement)
     re = cost_of_equity(beta, risk_free_interest_rate, market_return)
+    if isinstance(debt, pd.DataFrame):
+        weighted_costs = (rd * debt * (1 - tax_rate_for_wacc)).add(re * equity, axis=0)
+        return (weighted_costs / debt.add(equity, axis=0)).mean(axis=1)
+
     debt.name = "d"
     tax_rate_for_wacc.name = "tc"
     rd.name = "rd"
@@ -66,9 +96,7 @@ def wacc(
     df["e"] = equity
     df["re"] = re
     df.dropna(inplace=True)
-    mean_wacc = df.apply(
-        lambda x: (x["re"] * x["e"] + x["rd"] * x["d"] * (1 - x["tc"]))
-        / (x["e"] + x["d"]),
-        axis=1,
+    mean_wacc = (
+        (df["re"] * df["e"] + df["rd"] * df["d"] * (1 - df["tc"])) / (df["e"] + df["d"])
     ).mean()
     return mean_wacc
@@ -16,8 +16,10 @@ setup(
     maintainer_email="leonardus.chen@gmail.com",
     license="MIT",
     scripts=[],
+    python_requires=">=3.8",
     install_requires=[
-        "pandas>=0.23.4",
+        "numpy>=1.20.3",
+        "pandas>=1.5.0",
         "python-dateutil>=2.7.5",
         "scipy>=1.1.0",
         "requests>=2.21.0",
@@ -0,0 +1,18 @@
+import os
+import pandas as pd
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+STATEMENT_FILES = {
+    "balance_sheet_statement": "aapl_balance_sheet",
+    "cash_flow_statement": "aapl_cash_flow",
+    "income_statement": "aapl_income_statement",
+}
+
+
+def aapl_statements():
+    """The AAPL statements of raw_data by statement name, laid out as the Financials attributes"""
+    return {
+        statement: pd.read_hdf(os.path.join(raw_data_dir, name + ".hdf"), key=name)
+        for statement, name in STATEMENT_FILES.items()
+    }
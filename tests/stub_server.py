@@ -0,0 +1,87 @@
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pyfinmod.financials import Financials
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+_files = {
+    "balance_sheet_statement": "aapl_balance_sheet.json",
+    "cash_flow_statement": "aapl_cash_flow.json",
+    "income_statement": "aapl_income_statement.json",
+    "profile": "aapl_summary.json",
+}
+
+
+def _load_responses():
+    responses = {}
+    for datatype, file_name in _files.items():
+        with open(os.path.join(raw_data_dir, file_name), "r") as f:
+            json_data = json.load(f)
+        if isinstance(json_data, list):
+            json_data = {"symbol": "AAPL", "financials": json_data}
+        responses[datatype] = json.dumps(json_data).encode()
+    return responses
+
+
+class StubServer:
+    """Local HTTP server answering /<datatype>/<ticker> with the AAPL data from raw_data
+
+    Tickers starting with "FAIL" get an empty 500 response and tickers "FLAKY<n>" an empty 503 response to
+    their first n requests of every datatype. Responses are sent after self.delay seconds. Every request is
+    counted in self.requests.
+
+    """
+
+    def __init__(self):
+        responses = _load_responses()
+        stub = self
+        self.requests = []
+        self.delay = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                _, datatype, ticker = self.path.split("?")[0].split("/")
+                with stub._lock:
+                    stub.requests.append((ticker, datatype))
+                    attempts = stub.requests.count((ticker, datatype))
+                time.sleep(stub.delay)
+                status = 200
+                if ticker.startswith("FAIL"):
+                    status = 500
+                elif ticker.startswith("FLAKY") and attempts <= int(ticker[len("FLAKY"):]):
+                    status = 503
+                body = responses[datatype] if status == 200 else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_address[1])
+        self.datatypes = {datatype: self.url + datatype + "/{}" for datatype in _files}
+
+    def financials_class(self):
+        """Financials subclass fetching from this server"""
+        class StubFinancials(Financials):
+            datatypes = self.datatypes
+
+        return StubFinancials
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,16 +1,23 @@
 from datetime import date
 from pytest import approx
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
+from pyfinmod.curve import YieldCurve
 from pyfinmod.basic import (
     convert_ir,
+    discount_factors,
     npv,
     irr,
+    irr_spread,
     pmt,
     flat_payments,
     fv,
+    fv_annuity,
     retirement_problem,
     get_annual_rate_cc,
+    annual_rates_cc,
+    rolling_rates_cc,
 )
 
 FLOAT_ABS = 0.1
@@ -21,6 +28,41 @@ def test_convert_ir():
     assert convert_ir(0.1, "year", "quarter") == approx(0.024114, abs=FLOAT_ABS)
 
 
+def test_convert_ir_arrays():
+    rates = np.array([0.05, 0.1, 0.2])
+    periods = np.array(["day", "quarter", "month"])
+    expected = [convert_ir(r, "year", p) for r, p in zip(rates, periods)]
+    assert convert_ir(rates, "year", periods) == approx(expected)
+    assert convert_ir(convert_ir(rates, "year", periods), periods, "year") == approx(rates)
+    assert convert_ir(rates[:, np.newaxis], "year", periods).shape == (3, 3)
+
+
+def test_discount_factors(monkeypatch):
+    days_passed = np.arange(0, 3650, 30)
+    rates = np.array([0.05, 0.1])
+    expected = (1 + convert_ir(rates[:, np.newaxis])) ** -days_passed
+    assert discount_factors(rates, days_passed) == approx(expected)
+
+    assert discount_factors(0.1, days_passed) == approx(expected[1])
+    assert discount_factors(0.1, days_passed) is not discount_factors(0.1, days_passed)
+    cached = discount_factors(0.1, days_passed, cache=True)
+    assert cached == approx(expected[1])
+    assert discount_factors(0.1, days_passed, cache=True) is cached
+    assert discount_factors(0.2, days_passed, cache=True) is not cached
+    # the grid is part of the key
+    assert discount_factors(0.1, days_passed[:3], cache=True).shape == (3,)
+    assert discount_factors(0.1, days_passed + 1, cache=True) == approx(expected[1] / (1 + convert_ir(0.1)))
+    periods = np.array(["day", "month"])
+    assert discount_factors(0.1, days_passed, period=periods, cache=True).shape == (2,) + days_passed.shape
+
+    monkeypatch.setattr("pyfinmod.basic.DISCOUNT_FACTOR_CACHE_BYTES", cached.nbytes)
+    discount_factors(0.3, days_passed, cache=True)
+    assert discount_factors(0.1, days_passed, cache=True) is not cached
+    assert discount_factors(0.1, days_passed, period="month") == approx(
+        (1 + convert_ir(0.1, "month")) ** -days_passed
+    )
+
+
 def test_npv():
     df = pd.DataFrame(
         data={
@@ -31,6 +73,46 @@ def test_npv():
     assert npv(df, 0.1) == approx(14.04634, abs=FLOAT_ABS)
 
 
+def test_npv_cache(monkeypatch):
+    df = pd.DataFrame(
+        data={
+            "cash flow": [-100] + [10] * 12,
+            "date": [date(2020, 1, 1) + relativedelta(months=i) for i in range(13)],
+        }
+    )
+    calls = []
+
+    def counting_convert_ir(*args, **kwargs):
+        calls.append(args)
+        return convert_ir(*args, **kwargs)
+
+    monkeypatch.setattr("pyfinmod.basic.convert_ir", counting_convert_ir)
+    value = npv(df, 0.07, cache=True)
+    assert value == approx(npv(df, 0.07))
+    assert len(calls) == 2
+    assert npv(df, 0.07, cache=True) == value
+    assert len(calls) == 2
+
+
+def test_npv_curve():
+    df = pd.DataFrame(
+        data={
+            "cash flow": [-100, 30, 40, 50],
+            "date": pd.to_datetime(["2020-01-01", "2021-01-01", "2022-01-01", "2023-01-01"]),
+        }
+    )
+    assert npv(df, YieldCurve.flat(0.1)) == approx(npv(df, 0.1))
+    curve = YieldCurve([366, 731, 1096], [0.02, 0.03, 0.04])
+    assert npv(df, curve) == approx(
+        -100 + 30 * 1.02 ** (-366 / 365) + 40 * 1.03 ** (-731 / 365) + 50 * 1.04 ** (-1096 / 365)
+    )
+    assert irr_spread(df, YieldCurve.flat(0.0))[0] == approx(irr(df)[0])
+    spread = irr_spread(df, curve)[0]
+    assert npv(df, 0) > 0 and spread > 0
+    shifted = YieldCurve([366, 731, 1096], [0.02 + spread, 0.03 + spread, 0.04 + spread])
+    assert npv(df, shifted) == approx(0)
+
+
 def test_irr():
     df3 = pd.DataFrame(
         data={
@@ -80,3 +162,59 @@ def test_get_annual_rate_cc():
         }
     )
     assert get_annual_rate_cc(df) == approx(0.231694, abs=FLOAT_ABS)
+
+
+def test_npv_input_types():
+    dates = [date(2020, 1, 1) + relativedelta(months=i) for i in range(13)]
+    cash_flows = [-100] + [10] * 12
+    df = pd.DataFrame(data={"cash flow": cash_flows, "date": dates})
+    expected = npv(df, 0.1)
+
+    series = pd.Series(cash_flows, index=pd.to_datetime(dates))
+    assert npv(series, 0.1) == approx(expected)
+
+    array = np.array(
+        list(zip(cash_flows, dates)),
+        dtype=[("cash flow", "f8"), ("date", "datetime64[D]")],
+    )
+    assert npv(array, 0.1) == approx(expected)
+
+    assert npv(df, [0.1, 0.2]) == approx([expected, npv(df, 0.2)])
+
+
+def test_annuity_broadcasting():
+    rates = np.array([0.0, 0.05, 0.07])
+    payments = pmt(10000, rates, 6, period="year")
+    assert payments[0] == approx(10000 / 6)
+    assert payments[2] == approx(pmt(10000, 0.07, 6, period="year"))
+
+    deposits = [1000 for _ in range(10)]
+    assert fv(deposits, rates) == approx([fv(deposits, r) for r in rates])
+    assert fv_annuity(1000, rates, 10) == approx(fv(deposits, rates))
+
+
+def test_retirement_problem_grid():
+    rates = np.array([[0.04], [0.05]])
+    withdrawals = np.array([40000, 50000])
+    res = retirement_problem(24, withdrawals, 25, rates)
+    assert res.shape == (2, 2)
+    assert res[1, 1] == approx(retirement_problem(24, 50000, 25, 0.05)[0])
+    assert res[0, 0] == approx(retirement_problem(24, 40000, 25, 0.04)[0])
+
+
+def test_annual_rates_cc():
+    dates = pd.date_range("2020-01-01", periods=4, freq="365D")
+    wide = pd.DataFrame({"a": [100, 110, 121, 133.1], "b": [np.nan, 50, 40, np.nan]}, index=dates)
+    rates = annual_rates_cc(wide.iloc[::-1])
+    assert rates["a"] == approx(np.log(1.1))
+    assert rates["b"] == approx(np.log(0.8))
+
+    long = wide.stack().dropna().rename("amount").rename_axis(["date", "instrument"]).reset_index()
+    assert annual_rates_cc(long.iloc[::-1]).to_numpy() == approx(rates.to_numpy())
+
+    rolling = rolling_rates_cc(wide, 2)
+    assert rolling["a"].to_numpy() == approx([np.nan, np.nan, np.log(1.1), np.log(1.1)], nan_ok=True)
+    assert rolling["b"].isna().all()
+    long_rolling = rolling_rates_cc(long, 1)
+    is_b = (long["instrument"] == "b").to_numpy()
+    assert long_rolling[is_b].to_numpy() == approx([np.nan, np.log(0.8)], nan_ok=True)
@@ -0,0 +1,60 @@
+import os
+import json
+import time
+import pandas as pd
+import pytest
+from pyfinmod.cache import HDFCache, SQLiteCache
+from pyfinmod.financials import Financials, ParserError
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+
+@pytest.fixture(params=[HDFCache, SQLiteCache])
+def cache_class(request):
+    return request.param
+
+
+def _cache_path(tmp_path, cache_class):
+    return str(tmp_path / ("cache.h5" if cache_class is HDFCache else "cache.sqlite"))
+
+
+def test_get_set(tmp_path, cache_class):
+    cache = cache_class(_cache_path(tmp_path, cache_class))
+    assert cache.get("AAPL", "profile") is None
+    cache.set("AAPL", "profile", {"profile": {"mktCap": "1"}})
+    assert cache.get("AAPL", "profile") == {"profile": {"mktCap": "1"}}
+    cache.clear()
+    assert cache.get("AAPL", "profile") is None
+
+
+def test_ttl_and_eviction(tmp_path, cache_class):
+    path = _cache_path(tmp_path, cache_class)
+    cache = cache_class(path, ttl=0.05, max_entries=2)
+    for ticker in ["A", "B", "C"]:
+        cache.set(ticker, "profile", {"ticker": ticker})
+    assert cache.get("A", "profile") is None
+    assert cache.get("C", "profile") == {"ticker": "C"}
+
+    time.sleep(0.1)
+    # offline mode serves stale entries
+    assert cache_class(path, ttl=0.05, read_only=True).get("C", "profile") == {"ticker": "C"}
+    assert cache.get("C", "profile") is None
+
+
+def test_financials_warm_start(tmp_path, cache_class):
+    path = _cache_path(tmp_path, cache_class)
+    with open(os.path.join(raw_data_dir, "aapl_income_statement.json"), "r") as f:
+        json_data = json.load(f)
+
+    parser = Financials("AAPL", cache=cache_class(path))
+    parser._fetch_json = lambda x: json_data
+    parser.income_statement
+
+    parser = Financials("AAPL", cache=cache_class(path, read_only=True))
+    parser._fetch_json = None
+    results = parser.income_statement
+    expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_income_statement.hdf"), key="aapl_income_statement")
+    assert results.equals(expected)
+
+    with pytest.raises(ParserError):
+        parser.cash_flow_statement
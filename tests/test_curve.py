@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from pytest import approx
+from pyfinmod.curve import YieldCurve
+
+
+def test_yield_curve():
+    curve = YieldCurve([365, 730, 1825], [0.02, 0.03, 0.04], max_days=3650)
+    assert len(curve.discount_factors) == 3651
+    assert curve.discount([0, 365, 730, 1825]) == approx([1, 1.02 ** -1, 1.03 ** -2, 1.04 ** -5])
+    assert curve.zero_rates([0, 182, 365, 1825, 3650, 7300]) == approx([0.02, 0.02, 0.02, 0.04, 0.04, 0.04])
+    # log-linear between tenors, i.e. flat forward rates
+    assert curve.discount(547.5) == approx(np.sqrt(1.02 ** -1 * 1.03 ** -2))
+    assert curve.discount(4000) == approx(1.04 ** -(4000 / 365))
+    assert curve.discount([365, 730], spread=0.01) == approx([1.03 ** -1, 1.04 ** -2])
+
+    flat = YieldCurve.flat(0.1)
+    days = np.array([0, 100, 365.5, 10000])
+    assert flat.discount(days) == approx(1.1 ** -(days / 365))
+    assert flat.long_rate == 0.1
+
+    with pytest.raises(ValueError):
+        YieldCurve([730, 365], [0.02, 0.03])
+    with pytest.raises(ValueError):
+        curve.discount(-5)
+    with pytest.raises(ValueError):
+        curve.zero_rates([10, -1])
@@ -1,11 +1,17 @@
 import os
+import numpy as np
 import pandas as pd
+import pytest
+from pytest import approx
+from pyfinmod.curve import YieldCurve
 from pyfinmod.ev import (
     net_working_capital,
     net_debt,
     enterprise_value,
     enterprise_value_efficient_market,
     fcf,
+    dcf,
+    dcf_grid,
 )
 
 raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
@@ -43,3 +49,57 @@ def test_get_fcf():
     df_res = fcf(df_cf)
     df_out = pd.read_hdf(os.path.join(raw_data_dir, "aapl_fcf.hdf"), key="aapl_fcf")
     assert df_res.equals(df_out)
+
+
+def test_ev_panel():
+    df_in = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    balance_sheets = {"AAPL": df_in, "MSFT": df_in.iloc[:, 1:] * 2}
+
+    nwc = net_working_capital(balance_sheets)
+    assert nwc.loc["AAPL"].equals(net_working_capital(df_in))
+    assert nwc.loc["MSFT"].dropna().equals(net_working_capital(df_in).iloc[1:] * 2)
+    assert net_debt(balance_sheets).loc["AAPL"].equals(net_debt(df_in))
+    assert enterprise_value(balance_sheets).loc["AAPL"].equals(enterprise_value(df_in))
+
+    market_caps = pd.Series({"MSFT": 2 * 10 ** 12, "AAPL": 1086 * 10 ** 9})
+    ev_em = enterprise_value_efficient_market(balance_sheets, market_caps)
+    assert ev_em["AAPL"] == 1093490000000.0
+    assert ev_em["MSFT"] == 2 * 10 ** 12 + 2 * net_debt(df_in).iloc[1]
+
+
+def test_dcf():
+    df_cf = pd.read_hdf(os.path.join(raw_data_dir, "aapl_cash_flow.hdf"), key="aapl_cash_flow")
+    fcfs = fcf(df_cf)
+    assert dcf(fcfs, 0.08476104586043534, 0.08, 0.04) == approx(1840754037391.706)
+    assert dcf(fcfs, 0.1, 0.1, 0.04, years=1) == approx(
+        fcfs.iloc[0] * 1.1 * (1 + 1.04 / 0.06) * np.sqrt(1.1)
+    )
+    with pytest.raises(ValueError):
+        dcf(fcfs, 0.04, 0.08, 0.04)
+
+
+def test_dcf_curve():
+    df_cf = pd.read_hdf(os.path.join(raw_data_dir, "aapl_cash_flow.hdf"), key="aapl_cash_flow")
+    fcfs = fcf(df_cf)
+    assert dcf(fcfs, YieldCurve.flat(0.085), 0.08, 0.04) == approx(dcf(fcfs, 0.085, 0.08, 0.04))
+    upward = YieldCurve([365, 1825], [0.06, 0.085])
+    assert dcf(fcfs, upward, 0.08, 0.04, years=1) == approx(
+        fcfs.iloc[0] * 1.08 * (1 + 1.04 / 0.045) * np.sqrt(1.06)
+    )
+    with pytest.raises(ValueError):
+        dcf(fcfs, YieldCurve([365, 1825], [0.06, 0.04]), 0.08, 0.04)
+
+
+def test_dcf_grid():
+    df_cf = pd.read_hdf(os.path.join(raw_data_dir, "aapl_cash_flow.hdf"), key="aapl_cash_flow")
+    fcfs = fcf(df_cf)
+    waccs = [0.07, 0.08, 0.09]
+    short_term_growths = [0.05, 0.08]
+    long_term_growths = [0.02, 0.03, 0.04, 0.05]
+    cube = dcf_grid(fcfs, waccs, short_term_growths, long_term_growths, years=[5, 10])
+    assert cube.shape == (3, 2, 4, 2)
+    assert cube[1, 1, 2, 0] == approx(dcf(fcfs, 0.08, 0.08, 0.04))
+    assert cube[2, 0, 3, 1] == approx(dcf(fcfs, 0.09, 0.05, 0.05, years=10))
+    assert dcf_grid(fcfs, 0.08, 0.08, 0.04).shape == (1, 1, 1, 1)
+    with pytest.raises(ValueError):
+        dcf_grid(fcfs, waccs, short_term_growths, [0.02, 0.07])
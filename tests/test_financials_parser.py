@@ -1,3 +1,4 @@
+import io
 import os
 import json
 from json import JSONDecodeError
@@ -5,6 +6,7 @@ from datetime import date
 import pandas as pd
 import pytest
 from pyfinmod.financials import Financials, ParserError
+from tests.stub_server import StubServer
 
 raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
 
@@ -22,6 +24,23 @@ def test_json_to_df():
     assert results.equals(expected)
 
 
+def test_statement_from_stream():
+    expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_income_statement.hdf"), key="aapl_income_statement")
+    results = Financials.statement_from_stream(os.path.join(raw_data_dir, "aapl_income_statement.json"))
+    assert results.equals(expected)
+
+    # top-level arrays split across many small reads
+    expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    with open(os.path.join(raw_data_dir, "aapl_balance_sheet.json"), "rb") as f:
+        records = Financials._iter_json_records(f, chunk_size=16)
+        assert Financials._records_to_df(records).equals(expected)
+
+    with pytest.raises(ParserError):
+        Financials.statement_from_stream(io.BytesIO(b'{"symbol": "AAPL"}'))
+    with pytest.raises(ParserError):
+        Financials.statement_from_stream(io.BytesIO(b'{"financials": [{"date": "2018-09-29", "Revenue": '))
+
+
 def test_fetch_json():
     parser = Financials("AAPL")
     parser.datatypes["balance_sheet_statement"] = "NotaValidURL"
@@ -101,3 +120,19 @@ def test_get_market_cap():
     parser._fetch_json = None
     results = parser.mktCap
     assert results == float(1230468047640.00)
+
+
+def test_fetch_many():
+    with StubServer() as server:
+        StubFinancials = server.financials_class()
+        financials, errors = StubFinancials.fetch_many(["AAPL", "FAIL", "MSFT"], max_workers=4)
+        assert sorted(financials) == ["AAPL", "FAIL", "MSFT"]
+        assert list(errors) == ["FAIL"]
+        assert sorted(errors["FAIL"]) == sorted(Financials.statements + ["profile"])
+        assert len(server.requests) == 12
+
+        expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+        for ticker in ["AAPL", "MSFT"]:
+            assert financials[ticker].balance_sheet_statement.equals(expected)
+            assert financials[ticker].mktCap == float(1230468047640.00)
+        assert len(server.requests) == 12
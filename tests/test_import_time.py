@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pyfinmod
+
+HEAVY_DEPENDENCIES = ["numpy", "pandas", "scipy", "dateutil", "requests", "tables"]
+# generous budget for importing every pyfinmod submodule, without the heavy dependencies it takes a few ms
+IMPORT_TIME_BUDGET_US = 200000
+
+
+def _import_times(statement):
+    """Run statement in a fresh interpreter with -X importtime, return cumulative import time by module"""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time():
+    statement = "import " + ", ".join("pyfinmod." + name for name in pyfinmod._submodules)
+    times = _import_times(statement)
+    assert not [name for name in times if name.split(".")[0] in HEAVY_DEPENDENCIES]
+    assert sum(times[name] for name in times if name.count(".") <= 1 and name.startswith("pyfinmod")) < (
+        IMPORT_TIME_BUDGET_US
+    )
+
+
+def test_lazy_submodules():
+    assert "basic" in dir(pyfinmod)
+    assert pyfinmod.basic.pmt(10000, 0.07, 6) > 0
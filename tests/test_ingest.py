@@ -0,0 +1,67 @@
+import os
+import shutil
+import tarfile
+import zipfile
+import pandas as pd
+import pytest
+from pyfinmod.financials import ParserError
+from pyfinmod.ingest import load_financials, load_universe
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+
+@pytest.fixture
+def dump_dir(tmp_path):
+    for name in os.listdir(raw_data_dir):
+        if name.endswith(".json"):
+            shutil.copy(os.path.join(raw_data_dir, name), tmp_path / name)
+            shutil.copy(os.path.join(raw_data_dir, name), tmp_path / name.replace("aapl", "msft"))
+    (tmp_path / "bad_cash_flow.json").write_text("{")
+    (tmp_path / "notes.txt").write_text("not a dump")
+    return tmp_path
+
+
+def _check(financials, errors):
+    assert sorted(financials) == ["AAPL", "BAD", "MSFT"]
+    assert list(errors) == ["BAD"]
+    assert isinstance(errors["BAD"]["cash_flow_statement"], ParserError)
+    for statement in ["balance_sheet", "cash_flow", "income_statement"]:
+        expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_{}.hdf".format(statement)), key="aapl_" + statement)
+        name = statement if statement == "income_statement" else statement + "_statement"
+        assert getattr(financials["MSFT"], "_" + name).equals(expected)
+    assert financials["AAPL"].mktCap == 1230468047640.00
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_load_financials(dump_dir, processes):
+    _check(*load_financials(str(dump_dir), processes=processes))
+
+
+def test_load_archives(dump_dir, tmp_path_factory):
+    archive_dir = tmp_path_factory.mktemp("archives")
+    zip_path = str(archive_dir / "dumps.zip")
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for name in os.listdir(dump_dir):
+            archive.write(dump_dir / name, os.path.join("nightly", name))
+    _check(*load_financials(zip_path, processes=2))
+
+    tar_path = str(archive_dir / "dumps.tar.gz")
+    with tarfile.open(tar_path, "w:gz") as archive:
+        archive.add(str(dump_dir), arcname="nightly")
+    _check(*load_financials(tar_path, processes=1))
+
+    tar_path = str(archive_dir / "dumps.tar")
+    with tarfile.open(tar_path, "w") as archive:
+        archive.add(str(dump_dir), arcname="nightly")
+    _check(*load_financials(tar_path, processes=2, chunksize=1))
+
+    with pytest.raises(ParserError):
+        load_financials(str(dump_dir / "notes.txt"))
+
+
+def test_load_universe(dump_dir):
+    universe, errors = load_universe(str(dump_dir), processes=2)
+    assert universe.tickers == ["AAPL", "MSFT"]
+    assert list(errors) == ["BAD"]
+    expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    assert universe.statement("MSFT", "balance_sheet_statement").equals(expected)
@@ -0,0 +1,58 @@
+import pandas as pd
+from pyfinmod import instrumentation
+from pyfinmod.instrumentation import MetricsCollector, add_hook, remove_hook
+from pyfinmod.basic import npv, pmt
+from tests.stub_server import StubServer
+
+
+def test_call_metrics():
+    df = pd.DataFrame(data={"cash flow": [-100, 60, 60], "date": pd.date_range("2020-01-01", periods=3, freq="365D")})
+    npv(df, 0.1)
+    with MetricsCollector() as collector:
+        npv(df, 0.1)
+        npv(df, 0.2)
+        pmt(10000, 0.07, 6)
+    npv(df, 0.1)
+    assert not instrumentation._hooks
+
+    stats = collector.call_stats
+    assert stats.at["basic.npv", "calls"] == 2
+    assert stats.at["basic.pmt", "calls"] == 1
+    assert (stats["seconds"] > 0).all()
+    assert npv.__name__ == "npv"
+
+
+def test_hooks():
+    events = []
+
+    def hook(event, name, fields):
+        events.append((event, name))
+
+    add_hook(hook)
+    try:
+        pmt(10000, 0.07, 6)
+    finally:
+        remove_hook(hook)
+    pmt(10000, 0.07, 6)
+    assert events[-1] == ("call", "basic.pmt")
+    assert all(event == "call" for event, name in events)
+
+
+def test_financials_metrics():
+    with StubServer() as server, MetricsCollector() as collector:
+        StubFinancials = server.financials_class()
+        parser = StubFinancials("AAPL")
+        parser.balance_sheet_statement
+        parser.balance_sheet_statement
+        parser.mktCap
+        StubFinancials("FAIL").fetch_many(["FAIL"], datatypes=["income_statement"])
+
+    fetch_stats = collector.fetch_stats
+    assert fetch_stats.at["balance_sheet_statement", "requests"] == 1
+    assert fetch_stats.at["balance_sheet_statement", "bytes"] > 0
+    assert fetch_stats.at["income_statement", "bytes"] == 0
+    assert fetch_stats.at["income_statement", "errors"] == 1
+    assert fetch_stats.at["balance_sheet_statement", "errors"] == 0
+    cache_stats = collector.cache_stats
+    assert cache_stats.at["attribute", "hits"] == 1
+    assert cache_stats.at["attribute", "misses"] == 3
@@ -0,0 +1,73 @@
+import os
+import pytest
+from pytest import approx
+import numpy as np
+import pandas as pd
+from pyfinmod.portfolio import batch_irr, batch_npv
+from pyfinmod.outofcore import COLUMNS, append_hdf, iter_valuations, valuations
+
+
+def _cash_flows(instruments=50):
+    rng = np.random.default_rng(1)
+    lengths = rng.integers(1, 12, instruments)
+    instrument = np.repeat(np.arange(instruments), lengths)
+    cash_flow = rng.normal(30, 10, len(instrument))
+    starts = np.cumsum(lengths) - lengths
+    cash_flow[starts] = -100
+    dates = np.datetime64("2020-01-01") + rng.integers(0, 3650, len(instrument)).astype("timedelta64[D]")
+    dates[starts] = np.datetime64("2019-01-01")
+    return pd.DataFrame({"instrument": instrument, "cash flow": cash_flow, "date": dates})
+
+
+def _expected(df):
+    expected = batch_irr(df, 0.1)
+    expected.insert(0, "npv", batch_npv(df, 0.08))
+    return expected
+
+
+def test_valuations_hdf(tmp_path):
+    df = _cash_flows()
+    path = str(tmp_path / "cash_flows.h5")
+    for start in range(0, len(df), 100):
+        chunk = df.iloc[start: start + 100]
+        append_hdf(path, chunk["instrument"], chunk["cash flow"], chunk["date"])
+
+    res = valuations(path, 0.08, chunk_size=37)
+    expected = _expected(df)
+    assert list(res.index) == list(expected.index)
+    assert res["npv"].to_numpy() == approx(expected["npv"].to_numpy())
+    assert res["irr"].to_numpy() == approx(expected["irr"].to_numpy(), nan_ok=True)
+    assert list(res["converged"]) == list(expected["converged"])
+
+
+def test_valuations_npy(tmp_path):
+    df = _cash_flows()
+    np.save(os.path.join(tmp_path, "instrument.npy"), df["instrument"].to_numpy())
+    np.save(os.path.join(tmp_path, "cash_flow.npy"), df["cash flow"].to_numpy())
+    np.save(os.path.join(tmp_path, "date.npy"), df["date"].to_numpy().astype("datetime64[D]"))
+
+    chunks = list(iter_valuations(str(tmp_path), 0.08, guess=None, chunk_size=5))
+    assert all(len(chunk) <= 6 for chunk in chunks)
+    res = pd.concat(chunks)
+    assert list(res.columns) == ["npv"]
+    assert res["npv"].to_numpy() == approx(_expected(df)["npv"].to_numpy())
+
+
+def test_valuations_ungrouped(tmp_path):
+    df = _cash_flows()
+    shuffled = df.sample(frac=1, random_state=0)
+    columns = {
+        "instrument": shuffled["instrument"].to_numpy(),
+        "cash_flow": shuffled["cash flow"].to_numpy(),
+        "date": shuffled["date"].to_numpy(),
+    }
+    with pytest.raises(ValueError):
+        valuations(columns, 0.08, chunk_size=37)
+    with pytest.raises(ValueError):
+        valuations({column: np.array(v) for column, v in zip(COLUMNS, ([1, 1, 2, 2, 1, 1], [1.0] * 6, [0] * 6))})
+
+    res = valuations(columns, 0.08, chunk_size=37, grouped=False, partitions=4).sort_index()
+    expected = _expected(df)
+    assert list(res.index) == list(expected.index)
+    assert res["npv"].to_numpy() == approx(expected["npv"].to_numpy())
+    assert res["irr"].to_numpy() == approx(expected["irr"].to_numpy(), nan_ok=True)
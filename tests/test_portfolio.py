@@ -0,0 +1,115 @@
+from datetime import date
+from pytest import approx
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from pyfinmod.basic import npv, irr, irr_spread, flat_payments
+from pyfinmod.curve import YieldCurve
+from pyfinmod.portfolio import (
+    batch_irr,
+    batch_npv,
+    batch_spread,
+    batch_valuation,
+    batch_irr_padded,
+    amortization_schedules,
+    iter_amortization_schedules,
+)
+
+FLOAT_ABS = 0.1
+
+
+def _long_cash_flows():
+    dates = [date(2020, 1, 1) + relativedelta(years=i) for i in range(6)]
+    return pd.DataFrame(
+        data={
+            "instrument": ["a"] * 6 + ["b"] * 3 + ["c"] * 2,
+            "cash flow": [-145, 100, 100, 100, 100, -275] + [-100, 60, 60] + [100, 100],
+            "date": dates + dates[:3] + dates[:2],
+        }
+    )
+
+
+def test_batch_irr():
+    df = _long_cash_flows()
+    res = batch_irr(df, 0.1)
+    assert list(res.index) == ["a", "b", "c"]
+    assert res.at["a", "irr"] == approx(irr(df[df["instrument"] == "a"], 0.1)[0])
+    assert res.at["b", "irr"] == approx(irr(df[df["instrument"] == "b"], 0.1)[0])
+    assert list(res["converged"]) == [True, True, False]
+    assert np.isnan(res.at["c", "irr"])
+
+    assert batch_irr(df, 0.4).at["a", "irr"] == approx(0.265857, abs=FLOAT_ABS)
+
+
+def test_batch_npv_and_spread():
+    df = _long_cash_flows()
+    curve = YieldCurve([365, 1000, 2000], [0.01, 0.03, 0.05])
+    res = batch_npv(df, curve)
+    assert list(res.index) == ["a", "b", "c"]
+    assert res["a"] == approx(npv(df[df["instrument"] == "a"], curve))
+    assert res["c"] == approx(100 + 100 * curve.discount(366))
+    flat = batch_npv(df, pd.Series({"a": 0.1, "b": 0.2, "c": 0.3}))
+    assert flat["b"] == approx(npv(df[df["instrument"] == "b"], 0.2))
+    assert batch_npv(df, 0.1)["a"] == approx(npv(df[df["instrument"] == "a"], 0.1))
+    assert batch_npv(df, 0.1, cache=True).to_numpy() == approx(batch_npv(df, 0.1).to_numpy())
+
+    spreads = batch_spread(df, curve, 0.1)
+    assert spreads.at["b", "spread"] == approx(irr_spread(df[df["instrument"] == "b"], curve, 0.1)[0])
+    assert list(spreads["converged"]) == [True, True, False]
+
+
+def test_batch_valuation():
+    df = _long_cash_flows()
+    res = batch_valuation(df, 0.08, 0.1)
+    assert list(res.columns) == ["npv", "irr", "converged", "payback", "total cash flow"]
+    assert res.at["a", "npv"] == approx(npv(df[df["instrument"] == "a"], 0.08))
+    assert res.at["b", "irr"] == approx(irr(df[df["instrument"] == "b"], 0.1)[0])
+    assert res["payback"].to_numpy() == approx([731 / 365, 731 / 365, 0])
+    assert list(res["total cash flow"]) == [-20, 20, 200]
+    assert not res.at["c", "converged"]
+
+    same_date = pd.DataFrame(
+        {
+            "instrument": [1, 1, 1],
+            "cash flow": [50, -100, 60],
+            "date": pd.to_datetime(["2020-01-01", "2020-01-01", "2021-01-01"]),
+        }
+    )
+    assert batch_valuation(same_date, 0.1).at[1, "payback"] == approx(366 / 365)
+    assert np.isnan(batch_valuation(same_date.iloc[:2], 0.1).at[1, "payback"])
+
+
+def test_batch_irr_padded():
+    df = _long_cash_flows()
+    cash_flows = np.full((3, 6), np.nan)
+    dates = np.full((3, 6), np.datetime64("NaT"), dtype="datetime64[D]")
+    for row, (_, group) in enumerate(df.groupby("instrument")):
+        cash_flows[row, : len(group)] = group["cash flow"]
+        dates[row, : len(group)] = group["date"]
+
+    rates, converged = batch_irr_padded(cash_flows, dates, 0.1)
+    expected = batch_irr(df, 0.1)
+    assert rates[:2] == approx(expected["irr"].to_numpy()[:2])
+    assert list(converged) == [True, True, False]
+
+
+def test_amortization_schedules():
+    res = amortization_schedules([10000, 100], [0.1, 0.3], [2, 12], period=["year", "month"])
+    assert len(res) == 14
+    assert list(res["loan"].unique()) == [0, 1]
+
+    first = res[res["loan"] == 0].drop(columns="loan")
+    assert first.values == approx(flat_payments(10000, 0.1, 2, period="year").values)
+    second = res[res["loan"] == 1].drop(columns="loan")
+    assert second.values == approx(flat_payments(100, 0.3, 12, period="month").values)
+
+    empty = amortization_schedules([], [], [])
+    assert empty.empty
+    assert list(empty.columns) == list(res.columns)
+
+
+def test_iter_amortization_schedules():
+    principal = np.linspace(1000, 5000, 5)
+    chunks = list(iter_amortization_schedules(principal, 0.05, 4, chunk_size=2))
+    assert [chunk["loan"].nunique() for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks, ignore_index=True).equals(amortization_schedules(principal, 0.05, 4))
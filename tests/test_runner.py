@@ -0,0 +1,61 @@
+import os
+import json
+import pytest
+from pytest import approx
+from pyfinmod.ev import enterprise_value, fcf, dcf
+from pyfinmod.financials import Financials
+from pyfinmod.runner import ValuationSpec, run_valuations
+from pyfinmod.store import StatementStore
+from pyfinmod.wacc import wacc
+from tests.statements import aapl_statements, raw_data_dir
+
+
+def _statements():
+    aapl = aapl_statements()
+    return {"AAPL": aapl, "MSFT": {statement: df * 2 for statement, df in aapl.items()}}
+
+
+def _profile():
+    with open(os.path.join(raw_data_dir, "aapl_summary.json"), "r") as f:
+        return json.load(f)["profile"]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_valuations_store(processes):
+    statements = _statements()
+    profiles = {"AAPL": _profile(), "MSFT": _profile()}
+    store = StatementStore.create(statements)
+    try:
+        results, errors, stats = run_valuations(
+            ["AAPL", "MSFT", "NONE"], source=store, profiles=profiles, processes=processes, chunk_size=2
+        )
+    finally:
+        store.unlink()
+
+    assert list(results.index) == ["AAPL", "MSFT"]
+    assert list(results.columns) == ["enterprise value", "net debt", "wacc", "dcf"]
+    assert results.at["AAPL", "wacc"] == approx(0.08476104586043534)
+    assert results.at["AAPL", "dcf"] == approx(1840754037391.706)
+    balance_sheet = statements["MSFT"]["balance_sheet_statement"]
+    assert results.at["MSFT", "enterprise value"] == enterprise_value(balance_sheet)[max(balance_sheet.columns)]
+    msft_wacc = wacc(1230468047640.00, balance_sheet, statements["MSFT"]["income_statement"], 1.139593, 0.02, 0.08)
+    assert results.at["MSFT", "wacc"] == approx(msft_wacc)
+    assert list(errors) == ["NONE"]
+    assert isinstance(errors["NONE"], KeyError)
+    assert stats["tickers"] == 3 and stats["failed"] == 1 and stats["chunks"] == 2
+    assert stats["tickers per second"] > 0
+
+
+def test_run_valuations_financials():
+    statements = _statements()
+    financials = {}
+    for ticker, frames in statements.items():
+        financials[ticker] = Financials(ticker)
+        for statement, df in frames.items():
+            setattr(financials[ticker], "_" + statement, df)
+        financials[ticker]._profile = _profile()
+
+    spec = ValuationSpec(wacc=0.1, years=3)
+    results, errors, _ = run_valuations(["AAPL", "MSFT"], spec=spec, source=financials, processes=2)
+    assert not errors
+    assert results.at["MSFT", "dcf"] == approx(dcf(fcf(statements["MSFT"]["cash_flow_statement"]), 0.1, 0.08, 0.04, 3))
@@ -0,0 +1,67 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pytest
+from pyfinmod.financials import ParserError
+from pyfinmod.instrumentation import MetricsCollector
+from pyfinmod.scheduler import FetchScheduler, TokenBucket
+from tests.stub_server import StubServer
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+
+@pytest.fixture
+def server():
+    with StubServer() as server:
+        yield server
+
+
+def test_coalescing(server):
+    server.delay = 0.2
+    scheduler = FetchScheduler()
+    StubFinancials = server.financials_class()
+
+    def load(ticker):
+        return StubFinancials(ticker, scheduler=scheduler).balance_sheet_statement
+
+    with MetricsCollector() as collector, ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(load, ["AAPL"] * 6 + ["MSFT"] * 2))
+    assert sorted(server.requests) == [("AAPL", "balance_sheet_statement"), ("MSFT", "balance_sheet_statement")]
+    expected = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    assert all(df.equals(expected) for df in results)
+    assert collector.cache_stats.at["in-flight", "hits"] == 6
+    assert collector.fetch_stats.at["balance_sheet_statement", "requests"] == 2
+
+
+def test_retries(server):
+    StubFinancials = server.financials_class()
+    scheduler = FetchScheduler(retries=3, backoff=0.01)
+    assert StubFinancials("FLAKY2", scheduler=scheduler).mktCap == float(1230468047640.00)
+    assert server.requests.count(("FLAKY2", "profile")) == 3
+
+    with MetricsCollector() as collector:
+        with pytest.raises(ParserError):
+            StubFinancials("FLAKY5", scheduler=FetchScheduler(retries=2, backoff=0.01)).profile
+    assert server.requests.count(("FLAKY5", "profile")) == 3
+    assert collector.fetch_stats.at["profile", "errors"] == 3
+
+    financials, errors = StubFinancials.fetch_many(["AAPL", "FAIL"], scheduler=scheduler)
+    assert list(errors) == ["FAIL"]
+    assert server.requests.count(("FAIL", "income_statement")) == 4
+
+
+def test_rate_limit(server):
+    bucket = TokenBucket(50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+    StubFinancials = server.financials_class()
+    scheduler = FetchScheduler(rate=20, burst=2)
+    start = time.monotonic()
+    StubFinancials.fetch_many(["A", "B"], scheduler=scheduler, max_workers=8)
+    # 8 requests with a burst of 2 at 20 per second
+    assert time.monotonic() - start >= 0.25
+    assert len(server.requests) == 8
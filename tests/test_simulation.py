@@ -0,0 +1,43 @@
+import os
+import numpy as np
+import pandas as pd
+from pytest import approx
+from pyfinmod.ev import dcf, fcf
+from pyfinmod.simulation import simulate_dcf, _simulate_values
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+
+def _fcfs():
+    df_cf = pd.read_hdf(os.path.join(raw_data_dir, "aapl_cash_flow.hdf"), key="aapl_cash_flow")
+    return fcf(df_cf)
+
+
+def test_simulate_dcf_without_shocks():
+    fcfs = _fcfs()
+    res = simulate_dcf(
+        fcfs, 0.08, 0.06, 0.03, wacc_sd=0, short_term_growth_sd=0, long_term_growth_sd=0, fcf_sd=0,
+        net_debt=1e10, shares=4e9, scenarios=1000, chunk_size=300, seed=0,
+    )
+    expected = dcf(fcfs, 0.08, 0.06, 0.03)
+    assert res.at["count", "enterprise value"] == 1000
+    assert res.loc[["mean", "min", "50%", "max"], "enterprise value"].to_numpy() == approx([expected] * 4)
+    assert res.at["50%", "value per share"] == approx((expected - 1e10) / 4e9)
+
+
+def test_simulate_dcf_quantiles():
+    fcfs = _fcfs()
+    res = simulate_dcf(fcfs, 0.08, 0.06, 0.03, scenarios=50000, chunk_size=10000, seed=42)
+
+    seed_sequences = np.random.SeedSequence(42).spawn(5)
+    parameters = {
+        "latest_fcf": fcfs[fcfs.index.max()], "wacc": 0.08, "wacc_sd": 0.01,
+        "short_term_growth": 0.06, "short_term_growth_sd": 0.02,
+        "long_term_growth": 0.03, "long_term_growth_sd": 0.005, "fcf_sd": 0.1, "years": 5,
+    }
+    values = np.concatenate([_simulate_values(s, 10000, parameters) for s in seed_sequences])
+    expected = pd.Series(values).describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95])
+    assert res["enterprise value"].to_numpy() == approx(expected.to_numpy(), rel=1e-3)
+
+    parallel = simulate_dcf(fcfs, 0.08, 0.06, 0.03, scenarios=50000, chunk_size=10000, seed=42, processes=2)
+    assert parallel.equals(res)
@@ -0,0 +1,49 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+from pyfinmod.ev import enterprise_value, fcf, dcf
+from pyfinmod.store import StatementStore
+from pyfinmod.wacc import wacc
+from tests.statements import STATEMENT_FILES, aapl_statements
+
+
+def _frames():
+    aapl = aapl_statements()
+    other = {statement: df.iloc[:, 2:] * 2 for statement, df in aapl.items()}
+    return {"AAPL": aapl, "MSFT": other}
+
+
+def _dcf(arguments):
+    store, ticker = arguments
+    return dcf(fcf(store.statement(ticker, "cash_flow_statement")), 0.085, 0.08, 0.04)
+
+
+@pytest.fixture(params=["shared_memory", "memmap"])
+def store(request, tmp_path):
+    path = str(tmp_path / "statements.bin") if request.param == "memmap" else None
+    store = StatementStore.create(_frames(), path=path)
+    yield store
+    store.unlink()
+
+
+def test_statement_views(store):
+    frames = _frames()
+    assert store.tickers == ["AAPL", "MSFT"]
+    balance_sheet = store.statement("AAPL", "balance_sheet_statement")
+    assert balance_sheet.equals(frames["AAPL"]["balance_sheet_statement"])
+    assert np.shares_memory(balance_sheet.to_numpy(), store._values)
+    assert store.statement("MSFT", "income_statement").equals(frames["MSFT"]["income_statement"])
+    assert list(store.frames("MSFT")) == list(STATEMENT_FILES)
+
+    income_statement = store.statement("AAPL", "income_statement")
+    assert wacc(1230468047640.00, balance_sheet, income_statement, 1.139593, 0.02, 0.08) == 0.08476104586043534
+    assert enterprise_value(balance_sheet).equals(enterprise_value(frames["AAPL"]["balance_sheet_statement"]))
+
+
+def test_workers(store):
+    assert len(pickle.dumps(store)) < 10000
+    with ProcessPoolExecutor(2) as executor:
+        values = list(executor.map(_dcf, [(store, "AAPL"), (store, "MSFT")]))
+    frames = _frames()
+    assert values == [dcf(fcf(frames[ticker]["cash_flow_statement"]), 0.085, 0.08, 0.04) for ticker in frames]
@@ -0,0 +1,59 @@
+from datetime import date
+from pytest import approx
+import numpy as np
+import pandas as pd
+from pyfinmod.basic import npv
+from pyfinmod.portfolio import batch_npv
+from pyfinmod.streaming import NPVAccumulator
+
+
+def _flows():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        data={
+            "instrument": rng.choice(["a", "b", "c"], 300),
+            "cash flow": rng.normal(0, 100, 300),
+            "date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 3650, 300), unit="D"),
+        }
+    )
+
+
+def test_add():
+    df = _flows()
+    accumulator = NPVAccumulator(0.1)
+    for row in df[df["instrument"] == "a"].itertuples(index=False):
+        accumulator.add(row[1], row[2])
+    assert accumulator.npv() == approx(npv(df[df["instrument"] == "a"], 0.1))
+    assert accumulator.counts[None] == (df["instrument"] == "a").sum()
+
+    accumulator = NPVAccumulator(0.1).add(100, date(2021, 1, 1)).add(-50, "2020-01-01")
+    assert accumulator.npv() == approx(-50 + 100 * 1.1 ** (-366 / 365))
+    assert accumulator.anchors[None] == pd.Timestamp("2020-01-01")
+
+
+def test_update():
+    df = _flows()
+    expected = batch_npv(df, 0.1)
+
+    accumulator = NPVAccumulator(0.1)
+    for start in range(0, len(df), 70):
+        accumulator.update(df.iloc[start: start + 70])
+    assert accumulator.npvs.sort_index().to_numpy() == approx(expected.to_numpy())
+
+    accumulator = NPVAccumulator(0.1)
+    accumulator.update((row for row in df.itertuples(index=False)), chunk_size=64)
+    assert len(accumulator) == 3
+    assert accumulator.npvs.sort_index().to_numpy() == approx(expected.to_numpy())
+    assert list(accumulator.anchors.sort_index()) == list(df.groupby("instrument")["date"].min())
+
+
+def test_update_without_instruments():
+    df = _flows()
+    a = df[df["instrument"] == "a"]
+    accumulator = NPVAccumulator(0.1)
+    accumulator.update({"cash flow": a["cash flow"].iloc[:-1], "date": a["date"].iloc[:-1]})
+    accumulator.add(a["cash flow"].iloc[-1], a["date"].iloc[-1])
+    assert len(accumulator) == 1
+    assert accumulator.npv() == approx(npv(a, 0.1))
+    assert list(accumulator.npvs.index) == [None]
+    assert accumulator.counts[None] == len(a)
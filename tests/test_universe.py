@@ -0,0 +1,56 @@
+import os
+import json
+from datetime import date
+import pandas as pd
+from pyfinmod.financials import Financials
+from pyfinmod.universe import Universe
+
+raw_data_dir = os.path.join(os.path.dirname(__file__), 'raw_data')
+
+
+def _frames():
+    balance_sheet = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    income_statement = pd.read_hdf(os.path.join(raw_data_dir, "aapl_income_statement.hdf"), key="aapl_income_statement")
+    return {
+        "AAPL": {"balance_sheet_statement": balance_sheet, "income_statement": income_statement},
+        "MSFT": {"balance_sheet_statement": balance_sheet.iloc[:, :5] * 2},
+    }
+
+
+def test_universe_slicing():
+    frames = _frames()
+    universe = Universe.from_frames(frames)
+    assert universe.tickers == ["AAPL", "MSFT"]
+    assert universe.panel("balance_sheet_statement").index.names == ["ticker", "item", "date"]
+
+    assets = universe.item("Total current assets")
+    assert list(assets.index) == ["AAPL", "MSFT"]
+    assert assets.at["MSFT", pd.Timestamp(2019, 9, 28)] == 2 * assets.at["AAPL", pd.Timestamp(2019, 9, 28)]
+    assert assets.loc["MSFT"].isna().sum() == 6
+
+    on_date = universe.on(date(2019, 9, 28), "balance_sheet_statement")
+    assert on_date.at["AAPL", "Total current assets"] == frames["AAPL"]["balance_sheet_statement"].at[
+        "Total current assets", date(2019, 9, 28)
+    ]
+    assert universe.item("Revenue").shape == (1, 11)
+
+
+def test_universe_statement_round_trip():
+    frames = _frames()
+    universe = Universe.from_frames(frames)
+    for ticker, ticker_frames in frames.items():
+        for statement, df in ticker_frames.items():
+            assert universe.statement(ticker, statement).equals(df)
+    assert universe.frame("balance_sheet_statement").shape == (58, 11)
+
+    compact = Universe.from_frames(frames, dtype="float32")
+    assert compact.panel("balance_sheet_statement").dtype == "float32"
+
+
+def test_universe_from_financials():
+    parser = Financials("AAPL")
+    with open(os.path.join(raw_data_dir, "aapl_cash_flow.json"), "r") as f:
+        json_data = json.load(f)
+    parser._fetch_json = lambda x: json_data
+    universe = Universe.from_financials([parser])
+    assert universe.statement("AAPL", "cash_flow_statement").equals(parser.cash_flow_statement)
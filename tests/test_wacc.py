@@ -1,5 +1,6 @@
 import os
 import pandas as pd
+from pytest import approx
 from pyfinmod.wacc import total_debt, tax_rate, cost_of_debt, wacc
 
 
@@ -36,3 +37,25 @@ def test_wacc():
     income_statement = pd.read_hdf(os.path.join(raw_data_dir, "aapl_income_statement.hdf"), key="aapl_income_statement")
     res_wacc = wacc(1230468047640.00, balance_sheet, income_statement, 1.139593, 0.02, 0.08)
     assert res_wacc == 0.08476104586043534
+
+
+def test_wacc_panel():
+    balance_sheet = pd.read_hdf(os.path.join(raw_data_dir, "aapl_balance_sheet.hdf"), key="aapl_balance_sheet")
+    income_statement = pd.read_hdf(os.path.join(raw_data_dir, "aapl_income_statement.hdf"), key="aapl_income_statement")
+    balance_sheets = {"AAPL": balance_sheet, "MSFT": balance_sheet.iloc[:, 1:] * 2}
+    income_statements = {"AAPL": income_statement, "MSFT": income_statement.iloc[:, 1:] * 2}
+
+    assert total_debt(balance_sheets).loc["AAPL"].equals(total_debt(balance_sheet))
+    assert tax_rate(income_statements).loc["AAPL"].equals(tax_rate(income_statement))
+    rd = cost_of_debt(balance_sheets, income_statements)
+    assert rd.loc["MSFT"].dropna().sort_index().equals(
+        cost_of_debt(balance_sheet.iloc[:, 1:] * 2, income_statement.iloc[:, 1:] * 2).sort_index()
+    )
+
+    equity = pd.Series({"AAPL": 1230468047640.00, "MSFT": 2 * 10 ** 12})
+    beta = pd.Series({"AAPL": 1.139593, "MSFT": 0.9})
+    res_wacc = wacc(equity, balance_sheets, income_statements, beta, 0.02, 0.08)
+    assert res_wacc["AAPL"] == approx(0.08476104586043534)
+    assert res_wacc["MSFT"] == approx(
+        wacc(2 * 10 ** 12, balance_sheet.iloc[:, 1:] * 2, income_statement.iloc[:, 1:] * 2, 0.9, 0.02, 0.08)
+    )